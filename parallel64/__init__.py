@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: 2022 Alec Delaney
 #
 # SPDX-License-Identifier: MIT
+# pylint: disable=too-many-lines
 
 """
 
@@ -13,18 +14,69 @@ Functionality fo interfacing with a parallel port
 
 """
 
-import sys
-from typing import TYPE_CHECKING, Optional, Sequence, Literal, Dict, List, Union
-import os
-import ctypes
-import time
-import json
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Optional,
+    Dict,
+    Iterable,
+    List,
+    Tuple,
+    Union,
+)
+import importlib
+import threading
+from contextlib import ExitStack
 from parallel64.pins import Pins, Pin
 from parallel64.constants import Direction, CommMode
+from parallel64.timing import busy_wait_ns
+from parallel64.polling import PollingStrategy
+from parallel64.probe import (
+    PortCapabilities,
+    get_capabilities,
+    is_bidirectional,
+    load_profile,
+)
+from parallel64.backends import (  # pylint: disable=unused-import
+    Backend,
+    DevPortBackend,
+    InpOutBackend,
+    SimulatedBackend,
+    SimulatedDevice,
+    SimulatedPrinter,
+    get_default_backend,
+)
+
+if TYPE_CHECKING:
+    from parallel64.aio import AsyncPoller
+    from parallel64.instrument import Instrumentation
+    from parallel64.trace import TraceRecorder
+    from parallel64.writer import QueuedWriter
+    from parallel64.monitor import EdgeMonitor
+    from parallel64.capture import Capture
+    from parallel64.pattern import Pattern, PlaybackReport
+
+# Classes from optional modules, which are only imported when first used
+_LAZY_ATTRIBUTES = {
+    "EdgeMonitor": "parallel64.monitor",
+    "EdgeEvent": "parallel64.monitor",
+    "Capture": "parallel64.capture",
+    "Pattern": "parallel64.pattern",
+    "PlaybackReport": "parallel64.pattern",
+    "PortGroup": "parallel64.group",
+    "Program": "parallel64.program",
+    "PortIO": "parallel64.stream",
+}
+
+
+def __getattr__(name: str):
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError as err:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from err
+    return getattr(importlib.import_module(module_name), name)
 
-if not TYPE_CHECKING:
-    if sys.platform != "win32":
-        raise OSError("parallel64 is meant for Windows systems only")
 
 # pylint: disable=too-few-public-methods
 class _BasePort:
@@ -33,19 +85,162 @@ class _BasePort:
 
     :param str|None windll_location: (optional) The location of the DLL required
         to use the parallel port, default is to use the one included in this package
+    :param Backend|None backend: (optional) The backend used to access the
+        registers, default is to use the platform's default backend (see
+        :func:`parallel64.backends.get_default_backend`)
+    :param bool shadow_registers: (optional) Whether the last values written to
+        the output registers should be tracked and used in place of reading
+        them back from the port, default is not to track them (False)
     """
 
-    def __init__(self, windll_location: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        windll_location: Optional[str] = None,
+        backend: Optional[Backend] = None,
+        shadow_registers: bool = False,
+    ) -> None:
+
+        if backend is None:
+            backend = get_default_backend(windll_location)
+        self._backend = backend
+        self._shadow_registers = shadow_registers
+        self._shadows: Dict[int, int] = {}
+        self._shadowed_addresses: Tuple[int, ...] = ()
+        self._register_locks: Dict[int, threading.RLock] = {}
+        self._async_poller: Optional["AsyncPoller"] = None
+
+    @property
+    def backend(self) -> Backend:
+        """The backend used to access the registers"""
+        return self._backend
+
+    @property
+    def async_poller(self) -> "AsyncPoller":
+        """The poller shared by all asyncio operations on the port, whose
+        ``interval`` sets how often the registers are polled
+        """
+        if self._async_poller is None:
+            # pylint: disable=import-outside-toplevel
+            from parallel64.aio import AsyncPoller
+
+            self._async_poller = AsyncPoller(self)
+        return self._async_poller
+
+    def instrument(
+        self, hook: Optional[Callable[[str, int, int, int], None]] = None
+    ) -> "Instrumentation":
+        """Starts counting and timing the register I/O of the port, which can be
+        stopped using the returned instrumentation's ``disable()`` or by using
+        it as a context manager
+
+        :param hook: (optional) A function called for every register access and
+            wait, see :class:`parallel64.instrument.Instrumentation`
+        :return: The enabled instrumentation
+        :rtype: Instrumentation
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from parallel64.instrument import Instrumentation
+
+        instrumentation = Instrumentation(self, hook)
+        instrumentation.enable()
+        return instrumentation
+
+    def record_trace(self, filepath: str) -> "TraceRecorder":
+        """Starts recording the register I/O of the port to a trace file, which
+        can be stopped using the returned recorder's ``stop()`` or by using it
+        as a context manager.  The trace can be replayed using
+        :func:`parallel64.trace.replay`.
+
+        :param str filepath: The path of the trace file to write
+        :return: The started recorder
+        :rtype: TraceRecorder
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from parallel64.trace import TraceRecorder
+
+        recorder = TraceRecorder(self, filepath)
+        recorder.start()
+        return recorder
+
+    def get_register_lock(self, address: int) -> threading.RLock:
+        """Returns the lock guarding writes to the register at the given address.
+        Each port has its own lock per output register, which the port holds for
+        the duration of read-modify-write operations on it.  The lock is
+        reentrant, so it can also be held by other code to make a sequence of
+        operations on the port atomic.  Only registers whose bits are changed
+        individually by read-modify-write operations have a lock; others, such
+        as the Status register or the EPP and FIFO registers, are only read or
+        written whole and have no lock.
+
+        :param int address: The address of the register
+        :return: The lock for the register
+        :rtype: threading.RLock
+        :raises ValueError: If the register has no lock
+        """
+        try:
+            return self._register_locks[address]
+        except KeyError as err:
+            raise ValueError(f"Register 0x{address:X} has no lock") from err
+
+    @property
+    def shadow_registers(self) -> bool:
+        """Whether shadow registers are in use.  When they are, the last values
+        written to the output registers are kept in memory, and read-modify-write
+        operations use them instead of reading the registers back from the port.
+        Changing this invalidates the shadow registers.
+        """
+        return self._shadow_registers
+
+    @shadow_registers.setter
+    def shadow_registers(self, use_shadows: bool) -> None:
+        self._shadow_registers = use_shadows
+        self.invalidate_shadow_registers()
 
-        if windll_location is None:
-            relative_dll_path = os.path.join(os.path.dirname(__file__), "inpoutdlls")
-            inpout_folder = os.path.abspath(relative_dll_path)
-            if sys.maxsize > 2**32:
-                windll_location = os.path.join(inpout_folder, "inpoutx64.dll")
-            else:
-                windll_location = os.path.join(inpout_folder, "inpout32.dll")
-        self._windll_location = windll_location
-        self._port = ctypes.WinDLL(windll_location)
+    def invalidate_shadow_registers(self) -> None:
+        """Discards the values in the shadow registers, so they are read from the
+        port the next time they are needed.  Use this if something else may have
+        written to the port.
+        """
+        self._shadows.clear()
+
+    def resync_shadow_registers(self) -> None:
+        """Reads the current values of the output registers from the port into
+        the shadow registers
+        """
+        self._shadows.clear()
+        if self._shadow_registers:
+            for address in self._shadowed_addresses:
+                self._shadows[address] = self._backend.read_byte(address)
+
+    def _read_latch(self, address: int) -> int:
+        """Reads the value last written to an output register, using the shadow
+        register if available
+
+        :param int address: The address of the register
+        :return: The value of the register
+        :rtype: int
+        """
+        if self._shadow_registers:
+            try:
+                return self._shadows[address]
+            except KeyError:
+                value = self._backend.read_byte(address)
+                if address in self._shadowed_addresses:
+                    self._shadows[address] = value
+                return value
+        return self._backend.read_byte(address)
+
+    def _write_latch(self, address: int, value: int) -> None:
+        """Writes to an output register, updating the shadow register if in use
+
+        :param int address: The address of the register
+        :param int value: The value to write
+        """
+        self._backend.write_byte(address, value)
+        if self._shadow_registers and address in self._shadowed_addresses:
+            self._shadows[address] = value
 
     @staticmethod
     def _parse_from_json(
@@ -66,22 +261,44 @@ class _BasePort:
             strings
         """
 
+        import json  # pylint: disable=import-outside-toplevel
+
         with open(json_filepath, mode="r", encoding="utf-8") as json_file:
             json_contents: Dict[str, str] = json.load(json_file)
-            json_params = {}
-            for key in port_params:
-                try:
-                    json_params[key] = int(json_contents[key], 16)
-                except KeyError as err:
-                    raise KeyError(
-                        f"Unable to find {key} parameter in the JSON file, "
-                        "see reference documentation"
-                    ) from err
-                except (ValueError, TypeError) as err:
-                    raise TypeError(
-                        "Ports must be hex strings (e.g. '0x1C64'), see reference documentation"
-                    ) from err
-            json_params["windll_location"] = json_contents.get("windll_location", None)
+        return _BasePort._parse_json_contents(json_contents, port_params)
+
+    @staticmethod
+    def _parse_json_contents(
+        json_contents: Dict[str, str], port_params: List[str]
+    ) -> Dict[str, Union[int, str]]:
+        """
+        Gets the given parameters from the contents of a JSON file
+
+        :param dict json_contents: The contents of the JSON file
+        :param list port_params: A list of the parameters to get from
+            the JSON contents as strings
+        :return: A dictionary that can be used to instance a _BasePort object
+        :rtype: dict
+        :raises KeyError: If an expected key is missing in the JSON
+            contents
+        :raises TypeError: If the ports are not written as hex
+            strings
+        """
+
+        json_params = {}
+        for key in port_params:
+            try:
+                json_params[key] = int(json_contents[key], 16)
+            except KeyError as err:
+                raise KeyError(
+                    f"Unable to find {key} parameter in the JSON file, "
+                    "see reference documentation"
+                ) from err
+            except (ValueError, TypeError) as err:
+                raise TypeError(
+                    "Ports must be hex strings (e.g. '0x1C64'), see reference documentation"
+                ) from err
+        json_params["windll_location"] = json_contents.get("windll_location", None)
 
         return json_params
 
@@ -99,6 +316,7 @@ class _BasePort:
         """
 
         json_params = cls._parse_from_json(json_filepath, port_params)
+        load_profile(json_filepath, get_default_backend(json_params["windll_location"]))
         return cls(**json_params)
 
     @classmethod
@@ -113,32 +331,54 @@ class _BasePort:
         raise NotImplementedError("Must be implemented in subclass")
 
 
+# pylint: disable=too-many-instance-attributes
 class StandardPort(_BasePort):
     """
     The class for representing the SPP port
 
+    The width of the STROBE pulse used when writing data can be changed using
+    ``strobe_width_ns`` (or ``strobe_width_us``) after initialization.
+
     :param int spp_base_address: The base address for the port, representing the
         SPP port data register
     :param str|None windll_location: (optional) The location of the DLL required
         to use the parallel port, default is to use the one included in this package
     :param bool reset_control: (optional) Whether the control register should be
         reset upon initialization, default is to reset it (True)
+    :param Backend|None backend: (optional) The backend used to access the
+        registers, default is to use the platform's default backend (see
+        :func:`parallel64.backends.get_default_backend`)
+    :param bool shadow_registers: (optional) Whether to keep shadow copies of the
+        Data and Control registers, default is not to (False)
     """
 
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         spp_base_address: int,
         windll_location: Optional[str] = None,
         reset_control: bool = True,
+        backend: Optional[Backend] = None,
+        shadow_registers: bool = False,
     ) -> None:
-        super().__init__(windll_location)
+        super().__init__(windll_location, backend, shadow_registers)
         self._spp_data_address = spp_base_address
         self._status_address = spp_base_address + 1
         self._control_address = spp_base_address + 2
-        self._is_bidir = self._test_bidirectional()
+        self._shadowed_addresses = (self._spp_data_address, self._control_address)
+        self._data_lock = threading.RLock()
+        self._control_lock = threading.RLock()
+        self._register_locks[self._spp_data_address] = self._data_lock
+        self._register_locks[self._control_address] = self._control_lock
+        self._strobe_width_ns = self.DEFAULT_STROBE_WIDTH_NS
+        self._is_bidir = is_bidirectional(self._backend, spp_base_address)
         if reset_control:
             self.spp_handshake_control_reset()
 
+    DEFAULT_STROBE_WIDTH_NS = 1000
+    """The default width of the STROBE pulse in nanoseconds, which comfortably
+    exceeds the 0.5 microsecond minimum of IEEE 1284"""
+
     @classmethod
     def from_json(cls, json_filepath: str) -> "StandardPort":
         """Factory method for creating and instance of StandardPort from a JSON
@@ -157,44 +397,81 @@ class StandardPort(_BasePort):
     def direction(self) -> Direction:
         """Get the current direction of the port"""
 
-        control_byte = self.read_control_register()
+        control_byte = self._read_latch(self._control_address)
         direction_byte = (1 << 5) & control_byte
         return Direction(direction_byte >> 5)
 
     @direction.setter
     def direction(self, direction: Direction) -> None:
 
-        control_byte = self.read_control_register()
-        new_control_byte = (direction.value << 5) | control_byte
-        self.write_control_register(new_control_byte)
-
-    def _test_bidirectional(self) -> bool:
-        """Tests whether the port has bidirectional support
+        with self._control_lock:
+            control_byte = self._read_latch(self._control_address) & 0b11011111
+            new_control_byte = (direction.value << 5) | control_byte
+            self.write_control_register(new_control_byte)
 
-        :return: Whether the port is bidirectional
-        :rtype: bool
+    @property
+    def strobe_width_ns(self) -> int:
+        """The width of the STROBE pulse in nanoseconds when writing data via SPP.
+        The pulse is timed by busy-waiting, so the CPU is kept busy for its
+        duration.  Setting this to 0 disables the delay entirely, for devices that
+        latch the data on the edge of the STROBE signal.
         """
+        return self._strobe_width_ns
 
-        curr_dir = self.direction
-        self.direction = Direction.REVERSE
-        is_bidir = not bool(self.direction.value)
-        self.direction = curr_dir
-        return is_bidir
+    @strobe_width_ns.setter
+    def strobe_width_ns(self, width: int) -> None:
+        if width < 0:
+            raise ValueError("The strobe width cannot be negative")
+        self._strobe_width_ns = int(width)
+
+    @property
+    def strobe_width_us(self) -> float:
+        """The width of the STROBE pulse in microseconds, see ``strobe_width_ns``"""
+        return self._strobe_width_ns / 1000
+
+    @strobe_width_us.setter
+    def strobe_width_us(self, width: float) -> None:
+        self.strobe_width_ns = round(width * 1000)
 
     @property
     def is_bidirectional(self) -> bool:
         """Returns whether the port is bidirectional, based on the test performed
-        during ``__init__()``
+        the first time a port at this address is created in the process (or
+        loaded from a capability profile)
         """
         return self._is_bidir
 
+    def probe_capabilities(
+        self, ecp_base_address: Optional[int] = None, reprobe: bool = False
+    ) -> PortCapabilities:
+        """Returns the capabilities of the port, probing it only if they are not
+        already cached for these base addresses.  The result can be saved next to a
+        JSON config file using :func:`parallel64.probe.save_profile`, so that
+        ports created with ``from_json()`` skip probing in later processes.
+
+        :param int|None ecp_base_address: (optional) The ECP base address of the
+            port, default is not to probe for an ECR (None)
+        :param bool reprobe: (optional) Whether to probe the port even if the
+            capabilities are cached, default is not to (False)
+        :return: The capabilities of the port
+        :rtype: PortCapabilities
+        """
+
+        with self._data_lock, self._control_lock:
+            capabilities = get_capabilities(
+                self._backend, self._spp_data_address, ecp_base_address, reprobe
+            )
+            self.invalidate_shadow_registers()
+        self._is_bidir = capabilities.bidirectional
+        return capabilities
+
     def write_data_register(self, data_byte: int) -> None:
         """Writes to the Data register
 
         :param data_byte: A byte of data
         :type data_byte: int
         """
-        self._port.DlPortWritePortUchar(self._spp_data_address, data_byte)
+        self._write_latch(self._spp_data_address, data_byte)
 
     def read_data_register(self) -> int:
         """Reads from the data register
@@ -205,7 +482,7 @@ class StandardPort(_BasePort):
         """
 
         if self._is_bidir:
-            return self._port.DlPortReadPortUchar(self._spp_data_address)
+            return self._backend.read_byte(self._spp_data_address)
 
         raise OSError(
             "This port was detected not to be bidirectional, data cannot be "
@@ -218,7 +495,7 @@ class StandardPort(_BasePort):
         :param control_byte: A byte of data
         :type control_byte: int
         """
-        self._port.DlPortWritePortUchar(self._control_address, control_byte)
+        self._write_latch(self._control_address, control_byte)
 
     def read_control_register(self) -> int:
         """Reads from the Control register
@@ -226,7 +503,7 @@ class StandardPort(_BasePort):
         :return: The information in the Control register
         :rtype: int
         """
-        return self._port.DlPortReadPortUchar(self._control_address)
+        return self._backend.read_byte(self._control_address)
 
     def read_status_register(self) -> int:
         """Reads from the Status register
@@ -234,31 +511,153 @@ class StandardPort(_BasePort):
         :return: The information in the Status register
         :rtype: int
         """
-        return self._port.DlPortReadPortUchar(self._status_address)
+        return self._backend.read_byte(self._status_address)
+
+    def read_registers(self) -> Tuple[int, int, int]:
+        """Reads the Data, Status and Control registers together, using a single
+        read with backends that support reading consecutive registers at once
+
+        :return: The bytes in the Data, Status and Control registers
+        :rtype: tuple
+        """
+        data_byte, status_byte, control_byte = self._backend.read_block(
+            self._spp_data_address, 3
+        )
+        return data_byte, status_byte, control_byte
 
-    def write_spp_data(self, data: int, hold_while_busy: bool = True) -> None:
+    def write_spp_data(
+        self,
+        data: int,
+        hold_while_busy: bool = True,
+        polling: Optional[PollingStrategy] = None,
+    ) -> None:
         """Writes data via SPP
 
         :param int data: The data to be transmitted
         :param bool hold_while_busy: Whether code should be blocked until the Busy
             line communicates the device is done receiving the data, default
             behavior is blocking (True)
+        :param PollingStrategy|None polling: (optional) The strategy used to wait
+            on the Busy line, default is to poll continuously with no timeout
         :raises OSError: If the port is busy
+        :raises TimeoutError: If the wait on the Busy line times out
         """
 
-        self.spp_handshake_control_reset()
-        if self.is_bidirectional:
-            self.direction = Direction.FORWARD
-        self.write_data_register(data)
-        if not bool((self.read_status_register() & (1 << 7)) >> 7):
-            raise OSError("Port is busy")
-        curr_control = self.read_control_register()
-        self.write_control_register(curr_control | 0b00000001)
-        time.sleep(0.001)
-        self.write_control_register(curr_control)
-        if hold_while_busy:
-            while not bool((self.read_status_register() & (1 << 7)) >> 7):
+        with self._data_lock, self._control_lock:
+            self.spp_handshake_control_reset()
+            if self.is_bidirectional:
+                self.direction = Direction.FORWARD
+            self.write_data_register(data)
+            if not bool((self.read_status_register() & (1 << 7)) >> 7):
+                raise OSError("Port is busy")
+            curr_control = self._read_latch(self._control_address)
+            self.write_control_register(curr_control | 0b00000001)
+            busy_wait_ns(self._strobe_width_ns)
+            self.write_control_register(curr_control)
+        if hold_while_busy and not self._wait_while_busy(polling):
+            raise TimeoutError("Timed out waiting for the port to not be busy")
+
+    def write_spp_bytes(
+        self,
+        buffer,
+        timeout: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> int:
+        """Writes a buffer of data via SPP.  The handshake is set up once, after
+        which each byte is written and strobed, waiting for the Busy line to
+        clear before each byte and after the last one.  The Data and Control
+        register locks are held for the whole transfer.
+
+        :param buffer: The data to be transmitted, as a ``bytes``, ``bytearray``,
+            ``memoryview`` or other object supporting the buffer protocol
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait for the Busy line to clear each time, default is to wait
+            indefinitely (None).  This is ignored if ``polling`` is given.
+        :param PollingStrategy|None polling: (optional) The strategy used to wait
+            on the Busy line, default is to poll continuously
+        :return: The number of bytes sent, which is less than the length of the
+            buffer if a wait for the Busy line timed out
+        :rtype: int
+        """
+
+        data = memoryview(buffer).cast("B")
+        if polling is None and timeout is not None:
+            polling = PollingStrategy(timeout)
+
+        read_byte = self._backend.read_byte
+        write_byte = self._backend.write_byte
+        data_address = self._spp_data_address
+        status_address = self._status_address
+        control_address = self._control_address
+        strobe_width_ns = self._strobe_width_ns
+
+        sent = 0
+        with self._data_lock, self._control_lock:
+            self.spp_handshake_control_reset()
+            if self._is_bidir:
+                self.direction = Direction.FORWARD
+            control_byte = self._read_latch(control_address)
+            strobe_byte = control_byte | 0b00000001
+
+            for data_byte in data:
+                if not read_byte(status_address) & 0b10000000:
+                    if not self._wait_while_busy(polling):
+                        break
+                write_byte(data_address, data_byte)
+                write_byte(control_address, strobe_byte)
+                if strobe_width_ns:
+                    busy_wait_ns(strobe_width_ns)
+                write_byte(control_address, control_byte)
+                sent += 1
+
+            if self._shadow_registers and sent:
+                self._shadows[data_address] = data[sent - 1]
+                self._shadows[control_address] = control_byte
+
+        if sent == len(data):
+            self._wait_while_busy(polling)
+        return sent
+
+    async def write_spp_data_async(
+        self, data: int, timeout: Optional[float] = None
+    ) -> None:
+        """Writes data via SPP like ``write_spp_data()``, but awaits the Busy
+        line clearing both before and after the data is strobed instead of
+        blocking on it.  Concurrent calls on the same port are serialized.
+
+        :param int data: The data to be transmitted
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait for the Busy line each time, default is to wait indefinitely
+            (None)
+        :raises TimeoutError: If a wait on the Busy line times out
+        """
+
+        poller = self.async_poller
+        status_address = self._status_address
+        async with poller.transfer_lock:
+            await poller.wait_for(status_address, 0b10000000, 0b10000000, timeout)
+            self.write_spp_data(data, hold_while_busy=False)
+            await poller.wait_for(status_address, 0b10000000, 0b10000000, timeout)
+
+    def _wait_while_busy(self, polling: Optional[PollingStrategy] = None) -> bool:
+        """Waits for the Busy line to clear.  If it is already clear, this returns
+        immediately without involving the polling strategy.
+
+        :param PollingStrategy|None polling: (optional) The strategy used to wait,
+            default is to poll continuously with no timeout
+        :return: Whether the Busy line cleared before timing out
+        :rtype: bool
+        """
+
+        read_byte = self._backend.read_byte
+        status_address = self._status_address
+        if read_byte(status_address) & 0b10000000:
+            return True
+        if polling is None:
+            while not read_byte(status_address) & 0b10000000:
                 pass
+            return True
+        return polling.wait(lambda: bool(read_byte(status_address) & 0b10000000))
 
     def read_spp_data(self) -> int:
         """Reads data on the SPP data register, while managing the SPP handshake
@@ -270,42 +669,105 @@ class StandardPort(_BasePort):
         """
 
         if self.is_bidirectional:
-            self.spp_handshake_control_reset()
-            self.direction = Direction.REVERSE
-            return self.read_data_register()
+            with self._control_lock:
+                self.spp_handshake_control_reset()
+                self.direction = Direction.REVERSE
+                return self.read_data_register()
 
         raise OSError(
             "This port was detected not to be bidirectional, data cannot be "
             "read using the data register/pins"
         )
 
+    def capture(
+        self,
+        samples: int,
+        duration: Optional[float] = None,
+        filepath: Optional[str] = None,
+    ) -> "Capture":
+        """Samples the Data, Status and Control registers as fast as possible,
+        like a logic analyzer, see :func:`parallel64.capture.capture`
+
+        :param int samples: The number of samples to take, which is the maximum
+            number if a duration is also given
+        :param float|None duration: (optional) The maximum time in seconds to
+            sample for, default is to take every sample regardless of time (None)
+        :param str|None filepath: (optional) The path of a file to stream the
+            samples into, default is to keep them in memory (None)
+        :return: The samples taken
+        :rtype: Capture
+        """
+        # pylint: disable=import-outside-toplevel
+        from parallel64.capture import capture
+
+        return capture(self, samples, duration, filepath)
+
+    def queued_writer(self, **kwargs) -> "QueuedWriter":
+        """Starts a writer that writes data via SPP from a background thread,
+        returning futures for the submissions instead of blocking on the device
+
+        :param kwargs: Additional arguments for :class:`parallel64.writer.QueuedWriter`,
+            such as ``max_queue`` and ``backpressure``
+        :return: The started writer, which can be used as a context manager to
+            close it when done
+        :rtype: QueuedWriter
+        """
+
+        # pylint: disable=import-outside-toplevel
+        from parallel64.writer import QueuedWriter
+
+        writer = QueuedWriter(self, **kwargs)
+        writer.start()
+        return writer
+
     def spp_handshake_control_reset(self) -> None:
         """Resets the Control register for the SPP handshake"""
 
-        control_byte = self.read_control_register()
-        bidir_control_byte = 0b11110000 if self._is_bidir else 0b11010000
-        pre_control_byte = bidir_control_byte & control_byte
-        new_control_byte = 0b00000100 | pre_control_byte
-        self.write_control_register(new_control_byte)
+        with self._control_lock:
+            control_byte = self._read_latch(self._control_address)
+            bidir_control_byte = 0b11110000 if self._is_bidir else 0b11010000
+            pre_control_byte = bidir_control_byte & control_byte
+            new_control_byte = 0b00000100 | pre_control_byte
+            self.write_control_register(new_control_byte)
 
 
 class ExtendedPort(_BasePort):
     """
-    The class for representing the ECP port.  Currently, this class only works
-    with the Extended Capabilities Register as opposed to the ECP port.
+    The class for representing the ECP port.  This class works with the
+    Extended Capabilities Register (ECR) and the ECP FIFO, which performs the
+    handshaking for each byte in hardware.
 
     :param int ecp_base_address: The base address for the port, representing the
         ECP port data register
     :param str|None windll_location: (optional) The location of the DLL required
         to use the parallel port, default is to use the one included in this
         package
+    :param Backend|None backend: (optional) The backend used to access the
+        registers, default is to use the platform's default backend (see
+        :func:`parallel64.backends.get_default_backend`)
+    :param bool shadow_registers: (optional) Whether to keep a shadow copy of the
+        ECR, default is not to (False)
     """
 
+    FIFO_SIZE = 16
+    """The size of the ECP FIFO in bytes, which is written and read in bursts
+    of up to this many bytes"""
+
+    _FIFO_MODES = (CommMode.SPP_FIFO, CommMode.ECP_FIFO, CommMode.FIFO_TEST)
+
     def __init__(
-        self, ecp_base_address: int, windll_location: Optional[str] = None
+        self,
+        ecp_base_address: int,
+        windll_location: Optional[str] = None,
+        backend: Optional[Backend] = None,
+        shadow_registers: bool = False,
     ) -> None:
-        super().__init__(windll_location)
+        super().__init__(windll_location, backend, shadow_registers)
+        self._fifo_address = ecp_base_address
         self._ecr_address = ecp_base_address + 2
+        self._shadowed_addresses = (self._ecr_address,)
+        self._ecr_lock = threading.RLock()
+        self._register_locks[self._ecr_address] = self._ecr_lock
 
     @classmethod
     def from_json(cls, json_filepath: str) -> "ExtendedPort":
@@ -323,13 +785,22 @@ class ExtendedPort(_BasePort):
 
     @property
     def comm_mode(self) -> CommMode:
-        """The communication mode in the ECR"""
-        mode = self.read_ecr_register()
+        """The communication mode in the ECR.  Setting the mode preserves the
+        other bits of the ECR, and switches through SPP mode first when going
+        from one FIFO mode to another as required by IEEE 1284.
+        """
+        mode = self._read_latch(self._ecr_address)
         return CommMode(mode >> 5)
 
     @comm_mode.setter
     def comm_mode(self, mode: CommMode) -> None:
-        self.write_ecr_register(mode.value << 5)
+        with self._ecr_lock:
+            ecr_byte = self._read_latch(self._ecr_address)
+            current_mode = ecr_byte >> 5
+            ecr_byte &= 0b00011100
+            if current_mode >= 2 and mode.value >= 2 and current_mode != mode.value:
+                self.write_ecr_register(ecr_byte | CommMode.SPP.value << 5)
+            self.write_ecr_register(ecr_byte | mode.value << 5)
 
     def write_ecr_register(self, data: int) -> None:
         """Write data to the Extended Capabilities Register (ECR)
@@ -337,7 +808,7 @@ class ExtendedPort(_BasePort):
         :param data: The data to write to the register
         :type data: int
         """
-        self._port.DlPortWritePortUchar(self._ecr_address, data)
+        self._write_latch(self._ecr_address, data)
 
     def read_ecr_register(self) -> int:
         """Read data in the Extended Capabilities Register (ECR)
@@ -345,7 +816,156 @@ class ExtendedPort(_BasePort):
         :return: The data in the register
         :rtype: int
         """
-        return self._port.DlPortReadPortUchar(self._ecr_address)
+        return self._backend.read_byte(self._ecr_address)
+
+    @property
+    def fifo_empty(self) -> bool:
+        """Whether the ECP FIFO is empty, according to the ECR"""
+        return bool(self._backend.read_byte(self._ecr_address) & 0b00000001)
+
+    @property
+    def fifo_full(self) -> bool:
+        """Whether the ECP FIFO is full, according to the ECR"""
+        return bool(self._backend.read_byte(self._ecr_address) & 0b00000010)
+
+    def write_fifo(
+        self,
+        buffer,
+        timeout: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> int:
+        """Writes a buffer of data to the ECP FIFO, which sends it using the
+        handshake of the current mode.  Whenever the FIFO is empty, a burst of
+        ``FIFO_SIZE`` bytes is written without checking the ECR in between.
+        Unless the port is in FIFO test mode, this waits for the FIFO to empty
+        after the last byte.
+
+        :param buffer: The data to be transmitted, as a ``bytes``, ``bytearray``,
+            ``memoryview`` or other object supporting the buffer protocol
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait for room in the FIFO each time, default is to wait
+            indefinitely (None).  This is ignored if ``polling`` is given.
+        :param PollingStrategy|None polling: (optional) The strategy used to wait
+            on the FIFO, default is to poll continuously
+        :return: The number of bytes written to the FIFO, which is less than the
+            length of the buffer if a wait for room in the FIFO timed out
+        :rtype: int
+        :raises OSError: If the port is not in a FIFO mode
+        """
+
+        data = memoryview(buffer).cast("B")
+        if polling is None and timeout is not None:
+            polling = PollingStrategy(timeout)
+
+        read_byte = self._backend.read_byte
+        write_byte = self._backend.write_byte
+        fifo_address = self._fifo_address
+        ecr_address = self._ecr_address
+        total = len(data)
+
+        sent = 0
+        with self._ecr_lock:
+            mode = self._check_fifo_mode()
+            while sent < total:
+                ecr_byte = read_byte(ecr_address)
+                if ecr_byte & 0b00000001:
+                    end = min(sent + self.FIFO_SIZE, total)
+                elif not ecr_byte & 0b00000010:
+                    end = sent + 1
+                elif self._wait_for_fifo(0b00000010, 0, polling):
+                    continue
+                else:
+                    break
+                for data_byte in data[sent:end]:
+                    write_byte(fifo_address, data_byte)
+                sent = end
+
+            if sent == total and mode != CommMode.FIFO_TEST:
+                self._wait_for_fifo(0b00000001, 0b00000001, polling)
+        return sent
+
+    def readinto_fifo(
+        self,
+        buffer,
+        timeout: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> int:
+        """Reads data from the ECP FIFO into a buffer.  Whenever the FIFO is full,
+        a burst of ``FIFO_SIZE`` bytes is read without checking the ECR in
+        between.  The port needs to be in the reverse direction for the FIFO to
+        be filled by the device.
+
+        :param buffer: The buffer to fill, as a ``bytearray``, ``memoryview`` or
+            other writable object supporting the buffer protocol
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait for data in the FIFO each time, default is to wait
+            indefinitely (None).  This is ignored if ``polling`` is given.
+        :param PollingStrategy|None polling: (optional) The strategy used to wait
+            on the FIFO, default is to poll continuously
+        :return: The number of bytes read, which is less than the length of the
+            buffer if a wait for data in the FIFO timed out
+        :rtype: int
+        :raises OSError: If the port is not in a FIFO mode
+        """
+
+        view = memoryview(buffer).cast("B")
+        if polling is None and timeout is not None:
+            polling = PollingStrategy(timeout)
+
+        read_byte = self._backend.read_byte
+        fifo_address = self._fifo_address
+        ecr_address = self._ecr_address
+        fifo_size = self.FIFO_SIZE
+        total = len(view)
+
+        received = 0
+        with self._ecr_lock:
+            self._check_fifo_mode()
+            while received < total:
+                ecr_byte = read_byte(ecr_address)
+                if ecr_byte & 0b00000010:
+                    end = min(received + fifo_size, total)
+                elif not ecr_byte & 0b00000001:
+                    end = received + 1
+                elif self._wait_for_fifo(0b00000001, 0, polling):
+                    continue
+                else:
+                    break
+                for index in range(received, end):
+                    view[index] = read_byte(fifo_address)
+                received = end
+        return received
+
+    def _check_fifo_mode(self) -> CommMode:
+        """Returns the current mode, ensuring it is a FIFO mode
+
+        :raises OSError: If the port is not in a FIFO mode
+        """
+        mode = self.comm_mode
+        if mode not in self._FIFO_MODES:
+            raise OSError(f"The port must be in a FIFO mode, not {mode.name}")
+        return mode
+
+    def _wait_for_fifo(
+        self, mask: int, expected: int, polling: Optional[PollingStrategy] = None
+    ) -> bool:
+        """Waits for the masked FIFO flags in the ECR to match the expected value
+
+        :param int mask: The mask for the flags to check
+        :param int expected: The expected value of the masked flags
+        :param PollingStrategy|None polling: (optional) The strategy used to wait,
+            default is to poll continuously with no timeout
+        :return: Whether the flags matched before timing out
+        :rtype: bool
+        """
+
+        read_byte = self._backend.read_byte
+        ecr_address = self._ecr_address
+        if polling is None:
+            while read_byte(ecr_address) & mask != expected:
+                pass
+            return True
+        return polling.wait(lambda: read_byte(ecr_address) & mask == expected)
 
 
 class EnhancedPort(StandardPort):
@@ -358,12 +978,26 @@ class EnhancedPort(StandardPort):
     :param str|None windll_location: (optional) The location of the DLL
         required to use the parallel port, default is to use the one
         included in this package
+    :param Backend|None backend: (optional) The backend used to access the
+        registers, default is to use the platform's default backend (see
+        :func:`parallel64.backends.get_default_backend`)
+    :param bool shadow_registers: (optional) Whether to keep shadow copies of the
+        Data and Control registers, default is not to (False)
     """
 
     def __init__(
-        self, spp_base_address: int, windll_location: Optional[str] = None
+        self,
+        spp_base_address: int,
+        windll_location: Optional[str] = None,
+        backend: Optional[Backend] = None,
+        shadow_registers: bool = False,
     ) -> None:
-        super().__init__(spp_base_address, windll_location)
+        super().__init__(
+            spp_base_address,
+            windll_location,
+            backend=backend,
+            shadow_registers=shadow_registers,
+        )
         self._epp_address_address = spp_base_address + 3
         self._epp_data_address = spp_base_address + 4
 
@@ -374,9 +1008,10 @@ class EnhancedPort(StandardPort):
         :type address: int
         """
 
-        self.spp_handshake_control_reset()
-        self.direction = Direction.FORWARD
-        self._port.DlPortWritePortUchar(self._epp_address_address, address)
+        with self._control_lock:
+            self.spp_handshake_control_reset()
+            self.direction = Direction.FORWARD
+            self._backend.write_byte(self._epp_address_address, address)
 
     def read_epp_address(self) -> int:
         """Read data from the EPP Address register (Address Read Cycle)
@@ -385,9 +1020,10 @@ class EnhancedPort(StandardPort):
         :rtype: int
         """
 
-        self.spp_handshake_control_reset()
-        self.direction = Direction.REVERSE
-        return self._port.DlPortReadPortUchar(self._epp_address_address)
+        with self._control_lock:
+            self.spp_handshake_control_reset()
+            self.direction = Direction.REVERSE
+            return self._backend.read_byte(self._epp_address_address)
 
     def write_epp_data(self, data: int) -> None:
         """Write data to the EPP Data register (Data Write Cycle)
@@ -396,9 +1032,10 @@ class EnhancedPort(StandardPort):
         :type data: int
         """
 
-        self.spp_handshake_control_reset()
-        self.direction = Direction.FORWARD
-        self._port.DlPortWritePortUchar(self._epp_data_address, data)
+        with self._control_lock:
+            self.spp_handshake_control_reset()
+            self.direction = Direction.FORWARD
+            self._backend.write_byte(self._epp_data_address, data)
 
     def read_epp_data(self) -> int:
         """Read data from the EPP Data register (Data Read Cycle)
@@ -406,9 +1043,115 @@ class EnhancedPort(StandardPort):
         :return: The information read
         :rtype: int
         """
+        with self._control_lock:
+            self.spp_handshake_control_reset()
+            self.direction = Direction.REVERSE
+            return self._backend.read_byte(self._epp_data_address)
+
+    @property
+    def epp_timeout(self) -> bool:
+        """Whether the EPP timeout bit in the Status register is set"""
+        return bool(self._backend.read_byte(self._status_address) & 0b00000001)
+
+    def clear_epp_timeout(self) -> None:
+        """Clears the EPP timeout bit in the Status register by writing a 1 to it"""
+        self._backend.write_byte(self._status_address, 0b00000001)
+
+    def write_epp_block(self, buffer) -> None:
+        """Writes a buffer of data to the EPP Data register (Data Write Cycles).
+        The handshake and direction are set up once, after which each byte is a
+        single register write.  The EPP timeout bit is cleared before the
+        transfer and checked once after it.
+
+        :param buffer: The data to write, as a ``bytes``, ``bytearray``,
+            ``memoryview`` or other object supporting the buffer protocol
+        :raises TimeoutError: If the peripheral did not complete a cycle
+        """
+
+        with self._control_lock:
+            self._prepare_epp_block(Direction.FORWARD)
+            self._write_epp_bytes(self._epp_data_address, buffer)
+            self._check_epp_timeout()
+
+    def readinto_epp_block(self, buffer) -> None:
+        """Reads data from the EPP Data register (Data Read Cycles) into a
+        buffer.  The handshake and direction are set up once, after which each
+        byte is a single register read.  The EPP timeout bit is cleared before
+        the transfer and checked once after it.
+
+        :param buffer: The buffer to fill, as a ``bytearray``, ``memoryview`` or
+            other writable object supporting the buffer protocol
+        :raises TimeoutError: If the peripheral did not complete a cycle
+        """
+
+        with self._control_lock:
+            self._prepare_epp_block(Direction.REVERSE)
+            self._readinto_epp_bytes(self._epp_data_address, buffer)
+            self._check_epp_timeout()
+
+    def write_epp_registers(self, address: int, buffer) -> None:
+        """Selects a peripheral register with an Address Write Cycle and then
+        writes a buffer of data to it with Data Write Cycles, setting up the
+        handshake and direction once for the whole burst
+
+        :param int address: The peripheral register address to write
+        :param buffer: The data to write, as a ``bytes``, ``bytearray``,
+            ``memoryview`` or other object supporting the buffer protocol
+        :raises TimeoutError: If the peripheral did not complete a cycle
+        """
+
+        with self._control_lock:
+            self._prepare_epp_block(Direction.FORWARD)
+            self._backend.write_byte(self._epp_address_address, address)
+            self._write_epp_bytes(self._epp_data_address, buffer)
+            self._check_epp_timeout()
+
+    def readinto_epp_registers(self, address: int, buffer) -> None:
+        """Selects a peripheral register with an Address Write Cycle and then
+        reads data from it into a buffer with Data Read Cycles, changing the
+        direction only once for the whole burst
+
+        :param int address: The peripheral register address to read
+        :param buffer: The buffer to fill, as a ``bytearray``, ``memoryview`` or
+            other writable object supporting the buffer protocol
+        :raises TimeoutError: If the peripheral did not complete a cycle
+        """
+
+        with self._control_lock:
+            self._prepare_epp_block(Direction.FORWARD)
+            self._backend.write_byte(self._epp_address_address, address)
+            self.direction = Direction.REVERSE
+            self._readinto_epp_bytes(self._epp_data_address, buffer)
+            self._check_epp_timeout()
+
+    def _prepare_epp_block(self, direction: Direction) -> None:
+        """Resets the handshake, sets the direction and clears the EPP timeout
+        bit ahead of a block transfer
+        """
         self.spp_handshake_control_reset()
-        self.direction = Direction.REVERSE
-        return self._port.DlPortReadPortUchar(self._epp_data_address)
+        self.direction = direction
+        self.clear_epp_timeout()
+
+    def _check_epp_timeout(self) -> None:
+        """Raises an error if the EPP timeout bit is set, clearing it first
+
+        :raises TimeoutError: If the EPP timeout bit is set
+        """
+        if self.epp_timeout:
+            self.clear_epp_timeout()
+            raise TimeoutError("EPP cycle timed out")
+
+    def _write_epp_bytes(self, address: int, buffer) -> None:
+        """Writes each byte of the buffer to an EPP register"""
+        write_byte = self._backend.write_byte
+        for data_byte in memoryview(buffer).cast("B"):
+            write_byte(address, data_byte)
+
+    def _readinto_epp_bytes(self, address: int, buffer) -> None:
+        """Fills the buffer with bytes read from an EPP register"""
+        read_byte = self._backend.read_byte
+        view = memoryview(buffer).cast("B")
+        view[:] = bytes(read_byte(address) for _ in range(len(view)))
 
 
 class GPIOPort(StandardPort):
@@ -418,6 +1161,10 @@ class GPIOPort(StandardPort):
     communication protocols.  It inherits from the StandardPort class, however, so
     those methods are available as well.
 
+    Writing pins is thread-safe: each port holds a lock per output register
+    while changing it (see ``get_register_lock()``), so threads sharing a port
+    do not lose each other's changes.  Reading pins does not take any locks.
+
     :param int spp_base_address: The base address for the port, representing the
         SPP port data register
     :param str|None windll_location: (optional) The location of the DLL required
@@ -429,16 +1176,26 @@ class GPIOPort(StandardPort):
         (according to SPP handshake protocol) upon initialization, default is
         not to reset the register (False). Note this takes place BEFORE clearing
         the pins via the ``clear_gpio`` argument.
+    :param Backend|None backend: (optional) The backend used to access the
+        registers, default is to use the platform's default backend (see
+        :func:`parallel64.backends.get_default_backend`)
+    :param bool shadow_registers: (optional) Whether to keep shadow copies of the
+        Data and Control registers, default is not to (False)
     """
 
+    # pylint: disable=too-many-arguments
     def __init__(
         self,
         spp_base_address: int,
         windll_location: Optional[str] = None,
         clear_gpio: bool = True,
         reset_control: bool = False,
+        backend: Optional[Backend] = None,
+        shadow_registers: bool = False,
     ) -> None:
-        super().__init__(spp_base_address, windll_location, reset_control)
+        super().__init__(
+            spp_base_address, windll_location, reset_control, backend, shadow_registers
+        )
         self.pins = Pins(self._spp_data_address, self.is_bidirectional)
         if clear_gpio:
             self.write_data_register(0)
@@ -455,10 +1212,8 @@ class GPIOPort(StandardPort):
         """
 
         if pin.input_allowed:
-            register_byte = self._port.DlPortReadPortUchar(pin.register)
-            bit_mask = 1 << pin.bit_index
-            bit_result = bool((bit_mask & register_byte) >> pin.bit_index)
-            return (not bit_result) if pin.hw_inverted else bit_result
+            register_byte = self._backend.read_byte(pin.register)
+            return bool((register_byte ^ pin.invert_mask) & pin.bit_mask)
         raise OSError("Input not allowed on pin " + str(pin.pin_number))
 
     def write_pin(self, pin: Pin, value: bool) -> None:
@@ -470,16 +1225,171 @@ class GPIOPort(StandardPort):
         """
 
         if pin.output_allowed:
-            register_byte = self._port.DlPortReadPortUchar(pin.register)
-            current_bit = ((1 << pin.bit_index) & register_byte) >> pin.bit_index
-            current_value = (not current_bit) if pin.hw_inverted else current_bit
-            if bool(current_value) != value:
-                bit_mask = 1 << pin.bit_index
-                byte_result = bit_mask ^ register_byte
-                self._port.DlPortWritePortUchar(pin.register, byte_result)
+            with self._register_locks[pin.register]:
+                register_byte = self._read_latch(pin.register)
+                current_value = bool((register_byte ^ pin.invert_mask) & pin.bit_mask)
+                if current_value != bool(value):
+                    byte_result = pin.bit_mask ^ register_byte
+                    self._write_latch(pin.register, byte_result)
         else:
             raise OSError("Output not allowed on pin " + str(pin.pin_number))
 
+    def read_pins(self, pins: Iterable[Pin]) -> List[bool]:
+        """Read the states of the given pins, reading each register involved only
+        once so that pins in the same register are sampled together
+
+        :param pins: The pins to read
+        :type pins: Iterable[Pin]
+        :return: The states of the pins, in the order they were given
+        :rtype: list
+        :raises OSError: If any of the pins are output-only
+        """
+
+        pins = list(pins)
+        for pin in pins:
+            if not pin.input_allowed:
+                raise OSError("Input not allowed on pin " + str(pin.pin_number))
+
+        register_bytes: Dict[int, int] = {}
+        for pin in pins:
+            if pin.register not in register_bytes:
+                register_bytes[pin.register] = self._backend.read_byte(pin.register)
+
+        return [
+            bool((register_bytes[pin.register] ^ pin.invert_mask) & pin.bit_mask)
+            for pin in pins
+        ]
+
+    def write_pins(self, pin_values: Dict[Pin, bool]) -> None:
+        """Set the states of the given pins, using a single read and write of
+        each register involved so that pins in the same register change together
+
+        :param dict pin_values: The states to set, keyed by pin
+        :raises OSError: If any of the pins are input-only
+        """
+
+        for pin in pin_values:
+            if not pin.output_allowed:
+                raise OSError("Output not allowed on pin " + str(pin.pin_number))
+
+        register_masks: Dict[int, List[int]] = {}
+        for pin, value in pin_values.items():
+            masks = register_masks.setdefault(pin.register, [0, 0])
+            masks[0] |= pin.bit_mask
+            if bool(value) != pin.hw_inverted:
+                masks[1] |= pin.bit_mask
+
+        with ExitStack() as stack:
+            for register in sorted(register_masks):
+                stack.enter_context(self._register_locks[register])
+            for register, (clear_mask, set_mask) in register_masks.items():
+                register_byte = self._read_latch(register)
+                byte_result = (register_byte & ~clear_mask & 0xFF) | set_mask
+                if byte_result != register_byte:
+                    self._write_latch(register, byte_result)
+
+    async def wait_for_pin(
+        self, pin: Pin, value: bool, timeout: Optional[float] = None
+    ) -> None:
+        """Waits until the given pin is in the given state, without blocking the
+        event loop
+
+        :param Pin pin: The pin to wait on
+        :param bool value: The state to wait for
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait, default is to wait indefinitely (None)
+        :raises OSError: If the pin is output-only
+        :raises TimeoutError: If the wait times out
+        """
+
+        if not pin.input_allowed:
+            raise OSError("Input not allowed on pin " + str(pin.pin_number))
+        expected = pin.bit_mask if bool(value) != pin.hw_inverted else 0
+        await self.async_poller.wait_for(pin.register, pin.bit_mask, expected, timeout)
+
+    async def status_changes(
+        self, pins: Optional[Iterable[Pin]] = None
+    ) -> AsyncIterator[Tuple[int, Dict[Pin, bool]]]:
+        """Watches the Status pins for changes
+
+        .. code-block::
+
+            async for timestamp_ns, states in gpio.status_changes():
+                if states[gpio.pins.ACK]:
+                    ...
+
+        :param pins: (optional) The Status pins to watch, default is to watch
+            all of them
+        :type pins: Iterable[Pin]|None
+        :return: An asynchronous iterator of the ``perf_counter_ns()``
+            timestamp of the poll that detected a change and the states of the
+            watched pins
+        :raises ValueError: If any of the pins are not Status pins
+        """
+
+        if pins is None:
+            pins = self.pins.get_register_pins(self._status_address)
+        pins = tuple(pins)
+        mask = 0
+        for pin in pins:
+            if pin.register != self._status_address:
+                raise ValueError(f"Pin {pin.pin_number} is not a Status pin")
+            mask |= pin.bit_mask
+
+        changes = self.async_poller.watch(self._status_address, mask)
+        try:
+            async for timestamp_ns, status_byte in changes:
+                yield timestamp_ns, {
+                    pin: bool((status_byte ^ pin.invert_mask) & pin.bit_mask)
+                    for pin in pins
+                }
+        finally:
+            await changes.aclose()
+
+    def monitor_edges(
+        self, pins: Optional[Iterable[Pin]] = None, **kwargs
+    ) -> "EdgeMonitor":
+        """Creates a monitor that detects edges on the given pins from a
+        background thread.  The monitor still needs to be started, either with
+        ``start()`` or by using it as a context manager.
+
+        :param pins: (optional) The pins to monitor, default is all the
+            Status pins
+        :type pins: Iterable[Pin]|None
+        :param kwargs: Additional arguments for :class:`EdgeMonitor`, such as
+            ``sample_rate``, ``buffer_size``, ``busy_wait``, ``edge`` and
+            ``callback``
+        :rtype: EdgeMonitor
+        :raises ValueError: If any of the pins are Control pins
+        """
+
+        if pins is None:
+            pins = self.pins.get_register_pins(self._status_address)
+        pins = tuple(pins)
+        for pin in pins:
+            if pin.register == self._control_address:
+                raise ValueError(f"Pin {pin.pin_number} cannot be monitored")
+        # pylint: disable=import-outside-toplevel
+        from parallel64.monitor import EdgeMonitor
+
+        return EdgeMonitor(self, pins, **kwargs)
+
+    def play_pattern(self, pattern: "Pattern", repeat: int = 1) -> "PlaybackReport":
+        """Plays a precompiled pattern of Data and Control register writes back
+        with deadline-based timing, see :func:`parallel64.pattern.play`.  The
+        Data and Control register locks are held for the whole playback.
+
+        :param Pattern pattern: The pattern to play
+        :param int repeat: (optional) The number of times to play the pattern,
+            default is once
+        :return: The timing of the playback
+        :rtype: PlaybackReport
+        """
+        # pylint: disable=import-outside-toplevel
+        from parallel64.pattern import play
+
+        return play(self, pattern, repeat)
+
     def reset_data_pins(self) -> None:
         """Reset the data pins (to low)"""
         self.write_spp_data(0)
@@ -487,8 +1397,9 @@ class GPIOPort(StandardPort):
     def reset_control_pins(self) -> None:
         """Reset the control pins (to low)"""
 
-        control_byte = self.read_control_register()
-        bidir_control_byte = 0b11110000 if self._is_bidir else 0b11010000
-        pre_control_byte = bidir_control_byte & control_byte
-        new_control_byte = 0b00000100 | pre_control_byte
-        self.write_control_register(new_control_byte)
+        with self._control_lock:
+            control_byte = self._read_latch(self._control_address)
+            bidir_control_byte = 0b11110000 if self._is_bidir else 0b11010000
+            pre_control_byte = bidir_control_byte & control_byte
+            new_control_byte = 0b00000100 | pre_control_byte
+            self.write_control_register(new_control_byte)
@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.aio`
+
+asyncio support for waiting on the port's registers, allowing many
+ports and waits to be handled by a single event loop
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import asyncio
+import time
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from parallel64 import _BasePort
+
+
+class AsyncPoller:
+    """Polls the registers of a port from a single asyncio task on behalf of
+    every coroutine waiting on the port.  Each register involved is read once
+    per polling interval, no matter how many coroutines are waiting on it.
+    The task is started when something starts waiting and stops once nothing
+    is waiting anymore, or when reading a register raises an exception, which
+    is then raised to everything waiting on the port.
+
+    Ports create their own poller when first needed, so this class does not
+    typically need to be used directly.
+
+    :param _BasePort port: The port to poll
+    :param float interval: (optional) The time in seconds between polls,
+        default is 0.001
+
+    :ivar asyncio.Lock transfer_lock: A lock used to serialize asynchronous
+        transfers on the port
+    """
+
+    def __init__(self, port: "_BasePort", interval: float = 0.001) -> None:
+        self.port = port
+        self.interval = interval
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._watchers: List[list] = []
+        self._task: Optional[asyncio.Task] = None
+        self.transfer_lock = asyncio.Lock()
+
+    def _ensure_running(self) -> None:
+        """Starts the polling task if it is not already running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def wait_for(
+        self, address: int, mask: int, expected: int, timeout: Optional[float] = None
+    ) -> int:
+        """Waits until the masked bits of a register match the expected value
+
+        :param int address: The address of the register
+        :param int mask: The mask for the bits to check
+        :param int expected: The expected value of the masked bits
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait, default is to wait indefinitely (None)
+        :return: The value of the register once it matched
+        :rtype: int
+        :raises TimeoutError: If the wait times out
+        :raises Exception: Any exception raised while polling the register
+        """
+
+        value = self.port.backend.read_byte(address)
+        if value & mask == expected:
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (address, mask, expected, future)
+        self._waiters.append(waiter)
+        self._ensure_running()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError as err:
+            raise TimeoutError(
+                f"Timed out waiting on the register at 0x{address:X}"
+            ) from err
+        finally:
+            self._waiters.remove(waiter)
+
+    async def watch(self, address: int, mask: int) -> AsyncIterator[Tuple[int, int]]:
+        """Watches the masked bits of a register for changes
+
+        :param int address: The address of the register
+        :param int mask: The mask for the bits to watch
+        :return: An asynchronous iterator of the ``perf_counter_ns()``
+            timestamp of the poll that detected a change and the new value of
+            the masked bits
+        :raises Exception: Any exception raised while polling the register
+        """
+
+        queue: asyncio.Queue = asyncio.Queue()
+        watcher = [address, mask, self.port.backend.read_byte(address) & mask, queue]
+        self._watchers.append(watcher)
+        self._ensure_running()
+        try:
+            while True:
+                change = await queue.get()
+                if isinstance(change, Exception):
+                    raise change
+                yield change
+        finally:
+            self._watchers.remove(watcher)
+
+    async def _run(self) -> None:
+        """Polls the registers until nothing is waiting on them, passing any
+        exception raised while polling on to everything waiting
+        """
+
+        try:
+            await self._poll()
+        except Exception as err:  # pylint: disable=broad-except
+            for _, _, _, future in self._waiters:
+                if not future.done():
+                    future.set_exception(err)
+            for _, _, _, queue in self._watchers:
+                queue.put_nowait(err)
+
+    async def _poll(self) -> None:
+        """Polls the registers until nothing is waiting on them"""
+
+        read_byte = self.port.backend.read_byte
+        perf_counter_ns = time.perf_counter_ns
+        while self._waiters or self._watchers:
+            samples = {}
+            timestamp_ns = perf_counter_ns()
+            for address, mask, expected, future in tuple(self._waiters):
+                if future.done():
+                    continue
+                if address not in samples:
+                    samples[address] = read_byte(address)
+                if samples[address] & mask == expected:
+                    future.set_result(samples[address])
+            for watcher in self._watchers:
+                address, mask, last_value, queue = watcher
+                if address not in samples:
+                    samples[address] = read_byte(address)
+                value = samples[address] & mask
+                if value != last_value:
+                    watcher[2] = value
+                    queue.put_nowait((timestamp_ns, value))
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,600 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.backends`
+
+Register I/O backends used by the ports to access the hardware
+registers, as well as an in-memory simulated port that can be used
+in place of real hardware
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import sys
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class Backend:
+    """Base class for all register I/O backends.  Backends are given the
+    absolute address of a register and read or write a single byte there.
+    """
+
+    def read_byte(self, address: int) -> int:
+        """Reads a byte from the register at the given address
+
+        :param int address: The address of the register
+        :return: The byte in the register
+        :rtype: int
+        """
+        raise NotImplementedError("Must be implemented in subclass")
+
+    def write_byte(self, address: int, value: int) -> None:
+        """Writes a byte to the register at the given address
+
+        :param int address: The address of the register
+        :param int value: The byte to write
+        """
+        raise NotImplementedError("Must be implemented in subclass")
+
+    def read_block(self, address: int, count: int) -> bytes:
+        """Reads the bytes from a run of consecutive registers, starting at the
+        given address.  Backends that can read several registers at once
+        override this, otherwise each register is read individually.
+
+        :param int address: The address of the first register
+        :param int count: The number of registers to read
+        :return: The bytes in the registers
+        :rtype: bytes
+        """
+        read_byte = self.read_byte
+        return bytes(read_byte(address + offset) for offset in range(count))
+
+
+class WrappingBackend(Backend):
+    """Base class for backends that wrap another backend, such as those used to
+    instrument or record a port.  Subclasses call the wrapped backend using
+    ``_wrapped_read_byte()`` and ``_wrapped_write_byte()``, which are bound
+    once for speed.  Wrapping backends can be stacked, and any one of them
+    can be removed from a stack using :func:`unwrap_backend`.
+
+    :param Backend backend: The backend to wrap
+    """
+
+    def __init__(self, backend: Backend) -> None:
+        self.set_backend(backend)
+
+    def set_backend(self, backend: Backend) -> None:
+        """Changes the backend that is wrapped
+
+        :param Backend backend: The backend to wrap
+        """
+        self.backend = backend
+        self._wrapped_read_byte = backend.read_byte
+        self._wrapped_write_byte = backend.write_byte
+
+    def read_byte(self, address: int) -> int:
+        return self._wrapped_read_byte(address)
+
+    def write_byte(self, address: int, value: int) -> None:
+        self._wrapped_write_byte(address, value)
+
+    def read_block(self, address: int, count: int) -> bytes:
+        return self.backend.read_block(address, count)
+
+
+def unwrap_backend(backend: Backend, wrapper: WrappingBackend) -> Backend:
+    """Removes a wrapping backend from a stack of them, linking the backend
+    that wraps it (if any) to the backend it wraps
+
+    :param Backend backend: The outermost backend of the stack
+    :param WrappingBackend wrapper: The wrapping backend to remove
+    :return: The outermost backend of the stack once the wrapper is removed
+    :rtype: Backend
+    """
+
+    if backend is wrapper:
+        return wrapper.backend
+    current = backend
+    while isinstance(current, WrappingBackend):
+        if current.backend is wrapper:
+            current.set_backend(wrapper.backend)
+            break
+        current = current.backend
+    return backend
+
+
+# The DLL functions are bound as read_byte() and write_byte() on each instance
+# instead of being called from overriding methods
+class InpOutBackend(Backend):  # pylint: disable=abstract-method
+    """Backend using the inpout DLL to access the registers.  Each DLL is only
+    loaded once per process, no matter how many backends use it.
+
+    :param str|None windll_location: (optional) The location of the DLL required
+        to use the parallel port, default is to use the one included in this package
+    :raises OSError: If not used on a Windows system
+    """
+
+    _dlls: Dict[str, object] = {}
+    _dlls_lock = threading.Lock()
+
+    def __init__(self, windll_location: Optional[str] = None) -> None:
+
+        if sys.platform != "win32":
+            raise OSError("The inpout backend is meant for Windows systems only")
+
+        if windll_location is None:
+            relative_dll_path = os.path.join(os.path.dirname(__file__), "inpoutdlls")
+            inpout_folder = os.path.abspath(relative_dll_path)
+            if sys.maxsize > 2**32:
+                windll_location = os.path.join(inpout_folder, "inpoutx64.dll")
+            else:
+                windll_location = os.path.join(inpout_folder, "inpout32.dll")
+        self.windll_location = windll_location
+
+        with self._dlls_lock:
+            dll = self._dlls.get(windll_location)
+            if dll is None:
+                import ctypes  # pylint: disable=import-outside-toplevel
+
+                dll = ctypes.WinDLL(windll_location)
+                self._dlls[windll_location] = dll
+        self._dll = dll
+
+        # Bind the DLL functions directly to skip a Python-level call per I/O
+        # pylint: disable=method-hidden
+        self.read_byte = self._dll.DlPortReadPortUchar
+        self.write_byte = self._dll.DlPortWritePortUchar
+
+
+class DevPortBackend(Backend):
+    """Backend accessing the registers through a file where each byte offset is
+    the register with that address, such as ``/dev/port`` on Linux.  Each
+    access is a single ``os.pread()`` or ``os.pwrite()`` call, and runs of
+    consecutive registers can be read with a single call using
+    ``read_block()``.  Access to ``/dev/port`` typically requires root.
+
+    :param str filepath: (optional) The path of the file to use, default is
+        ``/dev/port``
+    """
+
+    def __init__(self, filepath: str = "/dev/port") -> None:
+        self.filepath = filepath
+        self._fd = os.open(filepath, os.O_RDWR)
+
+    def read_byte(self, address: int) -> int:
+        return os.pread(self._fd, 1, address)[0]
+
+    def write_byte(self, address: int, value: int) -> None:
+        os.pwrite(self._fd, bytes((value,)), address)
+
+    def read_block(self, address: int, count: int) -> bytes:
+        return os.pread(self._fd, count, address)
+
+    def close(self) -> None:
+        """Closes the file"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> "DevPortBackend":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+_default_backends: Dict[Optional[str], Backend] = {}
+_default_backends_lock = threading.Lock()
+
+
+def get_default_backend(windll_location: Optional[str] = None) -> Backend:
+    """Returns the default backend for the platform, which is an
+    :class:`InpOutBackend` on Windows and a :class:`DevPortBackend` using
+    ``/dev/port`` on Linux.  The backend is created the first time it is
+    needed and then shared by every port in the process.
+
+    :param str|None windll_location: (optional) The location of the DLL used
+        on Windows, default is to use the one included in this package
+    :return: The default backend
+    :rtype: Backend
+    :raises OSError: If there is no default backend for the platform
+    """
+
+    if sys.platform == "win32":
+        key = windll_location
+    elif sys.platform.startswith("linux"):
+        key = None
+    else:
+        raise OSError(f"No default backend is available for {sys.platform}")
+
+    with _default_backends_lock:
+        backend = _default_backends.get(key)
+        if backend is None:
+            if sys.platform == "win32":
+                backend = InpOutBackend(windll_location)
+            else:
+                backend = DevPortBackend()
+            _default_backends[key] = backend
+    return backend
+
+
+class SimulatedDevice:
+    """A device attached to a :class:`SimulatedBackend`.  On its own, it is
+    always ready and acts as an EPP peripheral with 256 byte-wide registers
+    selected using the EPP address.  Subclasses can override the hooks to
+    model other devices.
+
+    :ivar int epp_address: The currently selected EPP address
+    :ivar bytearray epp_registers: The registers accessed via EPP data cycles
+    :ivar int data_output: The byte driven onto the data lines by the device
+        when the port is in the reverse direction
+    :ivar bytearray fifo_received: The bytes received through the ECP FIFO
+    :ivar bytearray fifo_output: The bytes waiting to be sent to the port
+        through the ECP FIFO when it is in the reverse direction
+    """
+
+    def __init__(self) -> None:
+        self.epp_address = 0
+        self.epp_registers = bytearray(256)
+        self.data_output = 0
+        self.fifo_received = bytearray()
+        self.fifo_output = bytearray()
+
+    # pylint: disable=no-self-use
+    def read_status(self) -> int:
+        """Returns the status lines as they would appear in bits 7-3 of the
+        Status register, called for every read of the register
+
+        :return: The status bits
+        :rtype: int
+        """
+        return 0b11011000
+
+    def strobe(self, data: int) -> None:
+        """Called when STROBE is asserted by the port
+
+        :param int data: The byte currently on the data lines
+        """
+
+    def epp_write_address(self, address: int) -> None:
+        """Called for an EPP address write cycle
+
+        :param int address: The address written
+        """
+        self.epp_address = address
+
+    def epp_read_address(self) -> int:
+        """Called for an EPP address read cycle
+
+        :return: The address read
+        :rtype: int
+        """
+        return self.epp_address
+
+    def epp_write_data(self, data: int) -> None:
+        """Called for an EPP data write cycle
+
+        :param int data: The data written
+        """
+        self.epp_registers[self.epp_address] = data
+
+    def epp_read_data(self) -> int:
+        """Called for an EPP data read cycle
+
+        :return: The data read
+        :rtype: int
+        """
+        return self.epp_registers[self.epp_address]
+
+    def fifo_receive(self, data: int) -> bool:
+        """Called when the port transmits a byte from its FIFO
+
+        :param int data: The byte transmitted
+        :return: Whether the byte was accepted, otherwise it stays in the FIFO
+        :rtype: bool
+        """
+        self.fifo_received.append(data)
+        return True
+
+    def fifo_transmit(self) -> Optional[int]:
+        """Called when the port can receive a byte into its FIFO
+
+        :return: The byte to send, or None if there is nothing to send
+        :rtype: int|None
+        """
+        if not self.fifo_output:
+            return None
+        return self.fifo_output.pop(0)
+
+
+# pylint: disable=too-many-instance-attributes
+class SimulatedPrinter(SimulatedDevice):
+    """A simulated printer which accepts bytes using the SPP handshake, driving
+    BUSY after each strobed byte and then pulsing ACK.  Timing is counted in
+    reads of the Status register so that simulations are deterministic.
+
+    :param int busy_reads: (optional) The number of Status register reads for
+        which BUSY is reported after a byte is strobed, default is 1
+    :param int ack_reads: (optional) The number of Status register reads for
+        which ACK is asserted once the device is no longer busy, default is 1
+
+    :ivar bytearray received: The bytes received by the printer
+    :ivar bool stalled: Whether the printer is stalled, in which case it
+        reports BUSY indefinitely
+    :ivar bool paper_out: Whether the PAPER_OUT line is asserted
+    :ivar bool error: Whether the ERROR line is asserted
+    """
+
+    def __init__(self, busy_reads: int = 1, ack_reads: int = 1) -> None:
+        super().__init__()
+        self.busy_reads = busy_reads
+        self.ack_reads = ack_reads
+        self.received = bytearray()
+        self.stalled = False
+        self.paper_out = False
+        self.error = False
+        self._busy_remaining = 0
+        self._ack_remaining = 0
+
+    def read_status(self) -> int:
+        busy = self.stalled or self._busy_remaining > 0
+        if self._busy_remaining > 0:
+            self._busy_remaining -= 1
+            if self._busy_remaining == 0:
+                self._ack_remaining = self.ack_reads
+            ack = False
+        elif self._ack_remaining > 0:
+            self._ack_remaining -= 1
+            ack = True
+        else:
+            ack = False
+
+        status_byte = 0b00010000
+        if not busy:
+            status_byte |= 0b10000000
+        if not ack:
+            status_byte |= 0b01000000
+        if self.paper_out:
+            status_byte |= 0b00100000
+        if not self.error:
+            status_byte |= 0b00001000
+        return status_byte
+
+    def strobe(self, data: int) -> None:
+        if self.stalled or self._busy_remaining > 0:
+            return
+        self.received.append(data)
+        self._busy_remaining = self.busy_reads
+        if not self.busy_reads:
+            self._ack_remaining = self.ack_reads
+
+
+# pylint: disable=too-many-instance-attributes
+class SimulatedBackend(Backend):
+    """Backend emulating the registers of a parallel port in memory, useful for
+    running and profiling the port classes without hardware.  The SPP Data,
+    Status and Control registers, the EPP Address and Data registers, the
+    Extended Capabilities Register (ECR) and the ECP FIFO are modelled.
+
+    The FIFO exchanges bytes with the device whenever the ECR is read, moving
+    up to ``fifo_transfer_rate`` bytes each time, so simulations of FIFO
+    transfers are deterministic.  With no device attached, the FIFO is never
+    emptied or filled by the other end.
+
+    :param int spp_base_address: The base address of the simulated port
+    :param int|None ecp_base_address: (optional) The ECP base address of the
+        simulated port, default is 0x400 above the SPP base address
+    :param bool bidirectional: (optional) Whether the simulated port supports
+        the reverse direction, default is to support it (True)
+    :param SimulatedDevice|None device: (optional) The device attached to the
+        port, default is to have nothing attached (None), in which case EPP
+        cycles time out
+    :param int fifo_size: (optional) The size of the ECP FIFO in bytes, default
+        is 16
+    :param int fifo_transfer_rate: (optional) The maximum number of bytes
+        exchanged between the FIFO and the device per ECR read, default is 4
+
+    :ivar int data_latch: The byte last written to the Data register
+    :ivar int control: The byte in the Control register
+    :ivar int ecr: The byte in the ECR, apart from the FIFO full and empty bits
+    :ivar bool epp_timeout: Whether the EPP timeout bit is set
+    :ivar collections.deque fifo: The bytes in the ECP FIFO
+    :ivar int fifo_overruns: The number of bytes written while the FIFO was full,
+        which are discarded
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        spp_base_address: int,
+        ecp_base_address: Optional[int] = None,
+        bidirectional: bool = True,
+        device: Optional[SimulatedDevice] = None,
+        fifo_size: int = 16,
+        fifo_transfer_rate: int = 4,
+    ) -> None:
+        if ecp_base_address is None:
+            ecp_base_address = spp_base_address + 0x400
+        self.spp_base_address = spp_base_address
+        self.ecp_base_address = ecp_base_address
+        self.bidirectional = bidirectional
+        self.device = device
+        self.fifo_size = fifo_size
+        self.fifo_transfer_rate = fifo_transfer_rate
+
+        self.data_latch = 0
+        self.control = 0
+        self.ecr = 0b00000000
+        self.epp_timeout = False
+        self.fifo: deque = deque()
+        self.fifo_overruns = 0
+
+        self._readers = {
+            spp_base_address: self._read_data,
+            spp_base_address + 1: self._read_status,
+            spp_base_address + 2: self._read_control,
+            spp_base_address + 3: self._read_epp_address,
+            ecp_base_address: self._read_fifo,
+            ecp_base_address + 1: self._read_config_b,
+            ecp_base_address + 2: self._read_ecr,
+        }
+        self._writers = {
+            spp_base_address: self._write_data,
+            spp_base_address + 1: self._write_status,
+            spp_base_address + 2: self._write_control,
+            spp_base_address + 3: self._write_epp_address,
+            ecp_base_address: self._write_fifo,
+            ecp_base_address + 1: self._write_config_b,
+            ecp_base_address + 2: self._write_ecr,
+        }
+        for epp_data_address in range(spp_base_address + 4, spp_base_address + 8):
+            self._readers[epp_data_address] = self._read_epp_data
+            self._writers[epp_data_address] = self._write_epp_data
+
+    def read_byte(self, address: int) -> int:
+        try:
+            reader = self._readers[address]
+        except KeyError as err:
+            raise ValueError(
+                f"Address 0x{address:X} is not mapped by the simulated port"
+            ) from err
+        return reader()
+
+    def write_byte(self, address: int, value: int) -> None:
+        try:
+            writer = self._writers[address]
+        except KeyError as err:
+            raise ValueError(
+                f"Address 0x{address:X} is not mapped by the simulated port"
+            ) from err
+        writer(value & 0xFF)
+
+    @property
+    def reversed(self) -> bool:
+        """Whether the data lines are currently in the reverse direction"""
+        return self.bidirectional and bool(self.control & 0b00100000)
+
+    def _read_data(self) -> int:
+        if self.reversed and self.device is not None:
+            return self.device.data_output
+        return self.data_latch
+
+    def _write_data(self, value: int) -> None:
+        self.data_latch = value
+
+    def _read_status(self) -> int:
+        if self.device is None:
+            status_byte = 0b11011000
+        else:
+            status_byte = self.device.read_status() & 0b11111000
+        return status_byte | int(self.epp_timeout)
+
+    def _write_status(self, value: int) -> None:
+        # Writing a 1 to the EPP timeout bit clears it
+        if value & 0b00000001:
+            self.epp_timeout = False
+
+    def _read_control(self) -> int:
+        return self.control
+
+    def _write_control(self, value: int) -> None:
+        if not self.bidirectional:
+            value &= 0b11011111
+        strobe_asserted = value & ~self.control & 0b00000001
+        self.control = value
+        if strobe_asserted and self.device is not None:
+            self.device.strobe(self.data_latch)
+
+    def _read_epp_address(self) -> int:
+        if self.device is None:
+            self.epp_timeout = True
+            return 0xFF
+        return self.device.epp_read_address()
+
+    def _write_epp_address(self, value: int) -> None:
+        if self.device is None:
+            self.epp_timeout = True
+        else:
+            self.device.epp_write_address(value)
+
+    def _read_epp_data(self) -> int:
+        if self.device is None:
+            self.epp_timeout = True
+            return 0xFF
+        return self.device.epp_read_data()
+
+    def _write_epp_data(self, value: int) -> None:
+        if self.device is None:
+            self.epp_timeout = True
+        else:
+            self.device.epp_write_data(value)
+
+    @property
+    def ecp_mode(self) -> int:
+        """The mode currently selected in the ECR"""
+        return self.ecr >> 5
+
+    def _read_ecr(self) -> int:
+        self._exchange_fifo()
+        fifo_flags = 0
+        if not self.fifo:
+            fifo_flags |= 0b00000001
+        if len(self.fifo) >= self.fifo_size:
+            fifo_flags |= 0b00000010
+        return self.ecr | fifo_flags
+
+    def _write_ecr(self, value: int) -> None:
+        # The FIFO full and empty bits are read-only
+        self.ecr = value & 0b11111100
+        # Switching to a non-FIFO mode resets the FIFO
+        if self.ecp_mode in (0, 1):
+            self.fifo.clear()
+
+    def _read_fifo(self) -> int:
+        if self.ecp_mode == 7:
+            # Configuration register A, reporting an 8-bit implementation
+            return 0b00010000
+        if self.ecp_mode not in (2, 3, 6) or not self.fifo:
+            return 0xFF
+        return self.fifo.popleft()
+
+    def _write_fifo(self, value: int) -> None:
+        if self.ecp_mode not in (2, 3, 6):
+            return
+        if len(self.fifo) >= self.fifo_size:
+            self.fifo_overruns += 1
+            return
+        self.fifo.append(value)
+
+    def _read_config_b(self) -> int:  # pylint: disable=no-self-use
+        return 0b00000000
+
+    def _write_config_b(self, value: int) -> None:
+        pass
+
+    def _exchange_fifo(self) -> None:
+        """Moves bytes between the FIFO and the device"""
+
+        mode = self.ecp_mode
+        if self.device is None or mode not in (2, 3):
+            return
+        if mode == 3 and self.reversed:
+            for _ in range(self.fifo_transfer_rate):
+                if len(self.fifo) >= self.fifo_size:
+                    break
+                data = self.device.fifo_transmit()
+                if data is None:
+                    break
+                self.fifo.append(data)
+        else:
+            for _ in range(self.fifo_transfer_rate):
+                if not self.fifo or not self.device.fifo_receive(self.fifo[0]):
+                    break
+                self.fifo.popleft()
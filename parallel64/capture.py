@@ -0,0 +1,220 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.capture`
+
+Logic analyzer-style capture of the Data, Status and Control registers
+into a preallocated buffer or a memory-mapped file
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import mmap
+import struct
+import time
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from parallel64 import StandardPort
+
+SAMPLE_FORMAT = struct.Struct("<qBBBx")
+"""The layout of a sample: a little-endian ``perf_counter_ns()`` timestamp
+followed by the Data, Status and Control register bytes and a padding byte"""
+
+SAMPLE_SIZE = SAMPLE_FORMAT.size  # pylint: disable=invalid-name
+"""The size of a sample in bytes"""
+
+_REGISTER_OFFSETS = {"data": 8, "status": 9, "control": 10}
+
+
+class Capture:
+    """The samples of a capture, stored back to back using
+    :const:`SAMPLE_FORMAT`.  Captures made to a file are memory-mapped, so they
+    can be larger than the available memory, and can be reopened using
+    ``Capture.load()``.
+
+    :param buffer: The buffer holding the samples
+    :type buffer: bytearray|mmap.mmap
+    :param int count: The number of samples in the buffer
+    :param file: (optional) The file backing the buffer, which is closed along
+        with the capture
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytearray, mmap.mmap],
+        count: int,
+        file: Optional[BinaryIO] = None,
+    ) -> None:
+        self.buffer = buffer
+        self.count = count
+        self._file = file
+
+    @classmethod
+    def load(cls, filepath: str) -> "Capture":
+        """Opens a capture previously saved to a file
+
+        :param str filepath: The path to the capture file
+        :rtype: Capture
+        """
+
+        # pylint: disable=consider-using-with
+        file = open(filepath, mode="rb")
+        size = file.seek(0, 2)
+        if not size:
+            file.close()
+            return cls(bytearray(), 0)
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, size // SAMPLE_SIZE, file)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int, int]]:
+        """Iterates through the samples as tuples of the timestamp and the
+        Data, Status and Control register bytes
+        """
+        view = memoryview(self.buffer)[: self.count * SAMPLE_SIZE]
+        return SAMPLE_FORMAT.iter_unpack(view)
+
+    def __enter__(self) -> "Capture":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Releases the buffer, and closes the backing file if there is one"""
+
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def register_bytes(self, register: str) -> bytes:
+        """Returns the samples of one register
+
+        :param str register: The register, either ``"data"``, ``"status"`` or
+            ``"control"``
+        :rtype: bytes
+        """
+
+        offset = _REGISTER_OFFSETS[register]
+        view = memoryview(self.buffer)[: self.count * SAMPLE_SIZE]
+        return view[offset::SAMPLE_SIZE].tobytes()
+
+    def to_numpy(self):
+        """Returns the samples as a NumPy structured array with the fields
+        ``timestamp_ns``, ``data``, ``status`` and ``control``.  The array is a
+        view of the capture's buffer, so no data is copied.  This requires
+        NumPy to be installed.
+
+        :rtype: numpy.ndarray
+        """
+
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        dtype = numpy.dtype(
+            [
+                ("timestamp_ns", "<i8"),
+                ("data", "u1"),
+                ("status", "u1"),
+                ("control", "u1"),
+                ("padding", "u1"),
+            ]
+        )
+        return numpy.frombuffer(self.buffer, dtype=dtype, count=self.count)
+
+
+def capture(
+    port: "StandardPort",
+    samples: int,
+    duration: Optional[float] = None,
+    filepath: Optional[str] = None,
+) -> Capture:
+    """Samples the Data, Status and Control registers of the port as fast as
+    possible, timestamping each sample.  The buffer for the samples is
+    allocated before sampling starts, so nothing is allocated while sampling.
+
+    :param StandardPort port: The port to sample
+    :param int samples: The number of samples to take, which is the maximum
+        number if a duration is also given
+    :param float|None duration: (optional) The maximum time in seconds to
+        sample for, default is to take every sample regardless of time (None)
+    :param str|None filepath: (optional) The path of a file to stream the
+        samples into, default is to keep them in memory (None)
+    :return: The samples taken
+    :rtype: Capture
+    """
+
+    size = samples * SAMPLE_SIZE
+    file = None
+    if filepath is None:
+        buffer = bytearray(size)
+    else:
+        # pylint: disable=consider-using-with
+        file = open(filepath, mode="w+b")
+        file.truncate(size)
+        buffer = mmap.mmap(file.fileno(), size) if size else bytearray()
+
+    # pylint: disable=protected-access
+    count = _sample(
+        port.backend.read_byte,
+        (port._spp_data_address, port._status_address, port._control_address),
+        buffer,
+        samples,
+        duration,
+    )
+
+    if file is not None:
+        if isinstance(buffer, mmap.mmap):
+            buffer.flush()
+            buffer.close()
+        file.truncate(count * SAMPLE_SIZE)
+        if not count:
+            file.close()
+            return Capture(bytearray(), 0)
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return Capture(buffer, count, file)
+
+
+def _sample(read_byte, addresses, buffer, samples, duration) -> int:
+    """Fills the buffer with samples, returning the number taken"""
+
+    data_address, status_address, control_address = addresses
+    pack_into = SAMPLE_FORMAT.pack_into
+    perf_counter_ns = time.perf_counter_ns
+
+    if duration is None:
+        for offset in range(0, samples * SAMPLE_SIZE, SAMPLE_SIZE):
+            pack_into(
+                buffer,
+                offset,
+                perf_counter_ns(),
+                read_byte(data_address),
+                read_byte(status_address),
+                read_byte(control_address),
+            )
+        return samples
+
+    deadline_ns = perf_counter_ns() + int(duration * 1_000_000_000)
+    count = 0
+    for offset in range(0, samples * SAMPLE_SIZE, SAMPLE_SIZE):
+        timestamp_ns = perf_counter_ns()
+        if timestamp_ns >= deadline_ns:
+            break
+        pack_into(
+            buffer,
+            offset,
+            timestamp_ns,
+            read_byte(data_address),
+            read_byte(status_address),
+            read_byte(control_address),
+        )
+        count += 1
+    return count
@@ -36,8 +36,8 @@ class CommMode(Enum):
 
     SPP = 0
     BYTE = 1
-    # SPP_FIFO = 2
-    # ECP_FIFO = 3
+    SPP_FIFO = 2
+    ECP_FIFO = 3
     EPP = 4
-    # FIFO_TEST = 6
-    # CONFIG = 7
+    FIFO_TEST = 6
+    CONFIG = 7
@@ -0,0 +1,293 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.group`
+
+Management of several ports from one process, running jobs on them
+concurrently with one worker thread per port
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+from parallel64.backends import Backend, get_default_backend
+from parallel64.probe import load_profile
+
+if TYPE_CHECKING:
+    from parallel64 import _BasePort
+
+
+def _port_types() -> Dict[str, tuple]:
+    """Returns the port classes that can be used in a multi-port JSON file,
+    along with the parameters they take from it
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from parallel64 import StandardPort, EnhancedPort, ExtendedPort, GPIOPort
+
+    return {
+        "StandardPort": (StandardPort, ["spp_base_address"]),
+        "EnhancedPort": (EnhancedPort, ["spp_base_address"]),
+        "GPIOPort": (GPIOPort, ["spp_base_address"]),
+        "ExtendedPort": (ExtendedPort, ["ecp_base_address"]),
+    }
+
+
+def _create_port(
+    name: str,
+    port_entry: Dict[str, str],
+    json_filepath: str,
+    windll_location: Optional[str],
+    backend: Optional[Backend],
+) -> "_BasePort":
+    """Creates a port from its entry in a multi-port JSON file"""
+
+    port_types = _port_types()
+    try:
+        port_class, port_params = port_types[port_entry.get("type", "")]
+    except KeyError as err:
+        raise ValueError(
+            f"Port {name} must have a type of one of {', '.join(port_types)}"
+        ) from err
+    # pylint: disable=protected-access
+    json_params = port_class._parse_json_contents(port_entry, port_params)
+    if json_params["windll_location"] is None:
+        json_params["windll_location"] = windll_location
+    if backend is None:
+        backend = get_default_backend(json_params["windll_location"])
+    load_profile(json_filepath, backend)
+    return port_class(backend=backend, **json_params)
+
+
+class PortGroup:
+    """A group of named ports, each with its own worker thread for running jobs
+    on it.  Jobs for the same port run one at a time in the order they were
+    submitted, while jobs for different ports run concurrently, so waiting on
+    a busy device on one port does not hold up the others.
+
+    .. code-block::
+
+        from parallel64.group import PortGroup
+
+        with PortGroup.from_json("station.json") as group:
+            futures = group.broadcast_write(b"Hello world!")
+            print({name: future.result() for name, future in futures.items()})
+            print(group.stats())
+
+    :param ports: The ports in the group by name
+    :type ports: Dict[str, _BasePort]
+    """
+
+    def __init__(self, ports: Dict[str, "_BasePort"]) -> None:
+        self._ports = dict(ports)
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"port-{name}")
+            for name in self._ports
+        }
+        # Submitted, completed, failed and total run time for each port
+        self._stats: Dict[str, List[int]] = {name: [0, 0, 0, 0] for name in ports}
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_json(
+        cls, json_filepath: str, backend: Optional[Backend] = None
+    ) -> "PortGroup":
+        """Factory method for creating a group from a JSON file describing
+        several ports.  The file holds a ``"ports"`` object mapping the name of
+        each port to an object with its ``"type"`` (``"StandardPort"``,
+        ``"EnhancedPort"``, ``"GPIOPort"`` or ``"ExtendedPort"``) and the
+        parameters the type's own ``from_json()`` expects.  A
+        ``"windll_location"`` can be given for all the ports at the top level
+        or for each port individually.
+
+        .. code-block:: json
+
+            {
+                "ports": {
+                    "receipts": {"type": "StandardPort", "spp_base_address": "0x378"},
+                    "labels": {"type": "StandardPort", "spp_base_address": "0x278"}
+                }
+            }
+
+        :param str json_filepath: Filepath to the JSON
+        :param Backend|None backend: (optional) The backend used by all the
+            ports, default is to use the platform's default backend
+        :return: A group of the ports described in the file
+        :rtype: PortGroup
+        :raises KeyError: If an expected key is missing in the JSON file
+        :raises ValueError: If a port has an unknown type
+        """
+
+        import json  # pylint: disable=import-outside-toplevel
+
+        with open(json_filepath, mode="r", encoding="utf-8") as json_file:
+            json_contents: Dict[str, Any] = json.load(json_file)
+        try:
+            port_entries: Dict[str, Dict[str, str]] = json_contents["ports"]
+        except KeyError as err:
+            raise KeyError(
+                "Unable to find ports parameter in the JSON file, "
+                "see reference documentation"
+            ) from err
+
+        windll_location = json_contents.get("windll_location")
+        ports = {}
+        for name, port_entry in port_entries.items():
+            ports[name] = _create_port(
+                name, port_entry, json_filepath, windll_location, backend
+            )
+        return cls(ports)
+
+    def __getitem__(self, name: str) -> "_BasePort":
+        return self._ports[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ports)
+
+    def __len__(self) -> int:
+        return len(self._ports)
+
+    @property
+    def names(self) -> List[str]:
+        """The names of the ports in the group"""
+        return list(self._ports)
+
+    def submit(self, name: str, job: Callable, *args, **kwargs) -> Future:
+        """Runs a job on a port in the port's worker thread
+
+        :param str name: The name of the port
+        :param job: The function to run, which is called with the port followed
+            by the other arguments given
+        :return: A future for the result of the job
+        :rtype: concurrent.futures.Future
+        """
+
+        port = self._ports[name]
+        with self._stats_lock:
+            self._stats[name][0] += 1
+        return self._executors[name].submit(self._run, name, job, port, args, kwargs)
+
+    def map(
+        self, job: Callable, *args, names: Optional[Iterable[str]] = None, **kwargs
+    ) -> Dict[str, Future]:
+        """Runs the same job on several ports concurrently
+
+        :param job: The function to run, which is called with each port followed
+            by the other arguments given
+        :param names: (optional) The names of the ports to run the job on,
+            default is every port in the group
+        :type names: Iterable[str]|None
+        :return: The futures for the results of the jobs by port name
+        :rtype: dict
+        """
+
+        if names is None:
+            names = self._ports
+        return {name: self.submit(name, job, *args, **kwargs) for name in names}
+
+    def broadcast_write(
+        self,
+        buffer,
+        names: Optional[Iterable[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Future]:
+        """Writes a buffer of data to several ports concurrently via SPP, using
+        ``write_spp_bytes()``
+
+        :param buffer: The data to be transmitted, as a ``bytes``, ``bytearray``,
+            ``memoryview`` or other object supporting the buffer protocol
+        :param names: (optional) The names of the ports to write to, default is
+            every port in the group that supports SPP (every port other than
+            an :class:`parallel64.ExtendedPort`)
+        :type names: Iterable[str]|None
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait for the Busy line to clear each time, default is to wait
+            indefinitely (None)
+        :return: The futures for the number of bytes sent by port name
+        :rtype: dict
+        :raises ValueError: If any of the named ports does not support SPP
+        """
+
+        if names is None:
+            names = [
+                name
+                for name, port in self._ports.items()
+                if hasattr(port, "write_spp_bytes")
+            ]
+        else:
+            names = list(names)
+            for name in names:
+                if not hasattr(self._ports[name], "write_spp_bytes"):
+                    raise ValueError(f"Port {name} does not support SPP")
+        data = bytes(buffer)
+        return self.map(
+            lambda port: port.write_spp_bytes(data, timeout=timeout), names=names
+        )
+
+    def stats(self) -> dict:
+        """Returns the job statistics of the group as a dictionary, with the
+        number of jobs submitted, completed and failed and the total time spent
+        running them for each port under ``"ports"`` and for the whole group
+        under ``"total"``
+
+        :rtype: dict
+        """
+
+        keys = ("submitted", "completed", "failed", "total_ns")
+        with self._stats_lock:
+            ports = {
+                name: dict(zip(keys, port_stats))
+                for name, port_stats in self._stats.items()
+            }
+        total = {
+            key: sum(port_stats[key] for port_stats in ports.values()) for key in keys
+        }
+        return {"ports": ports, "total": total}
+
+    def close(self, wait: bool = True) -> None:
+        """Stops the worker threads
+
+        :param bool wait: (optional) Whether to wait for the jobs already
+            submitted to finish, default is to wait (True)
+        """
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "PortGroup":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    # pylint: disable=too-many-arguments
+    def _run(self, name: str, job: Callable, port: "_BasePort", args, kwargs) -> Any:
+        """Runs a job, recording its statistics"""
+
+        start_ns = time.perf_counter_ns()
+        failed = True
+        try:
+            result = job(port, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            duration_ns = time.perf_counter_ns() - start_ns
+            with self._stats_lock:
+                port_stats = self._stats[name]
+                port_stats[2 if failed else 1] += 1
+                port_stats[3] += duration_ns
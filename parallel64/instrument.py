@@ -0,0 +1,319 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.instrument`
+
+Optional instrumentation of a port's register I/O, counting accesses per
+register and per public method and recording latency histograms
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import functools
+import inspect
+import threading
+import time
+from types import FunctionType
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from parallel64.backends import Backend, WrappingBackend, unwrap_backend
+
+if TYPE_CHECKING:
+    from parallel64 import _BasePort
+
+HISTOGRAM_BUCKETS = 40
+"""The number of buckets in a latency histogram.  Bucket ``n`` counts the
+durations of ``2**(n-1)`` up to ``2**n - 1`` nanoseconds, with the last
+bucket also counting anything longer."""
+
+# The private methods that wait on the port, and the names their waits are
+# recorded under
+_WAIT_METHODS = {"_wait_while_busy": "busy", "_wait_for_fifo": "fifo"}
+
+
+class _InstrumentedBackend(WrappingBackend):
+    """Backend wrapping another, reporting each access to an instrumentation"""
+
+    def __init__(self, backend: Backend, instrumentation: "Instrumentation") -> None:
+        super().__init__(backend)
+        self._instrumentation = instrumentation
+
+    def read_byte(self, address: int) -> int:
+        start_ns = time.perf_counter_ns()
+        value = self._wrapped_read_byte(address)
+        self._instrumentation.record_io(
+            "read", address, value, time.perf_counter_ns() - start_ns
+        )
+        return value
+
+    def write_byte(self, address: int, value: int) -> None:
+        start_ns = time.perf_counter_ns()
+        self._wrapped_write_byte(address, value)
+        self._instrumentation.record_io(
+            "write", address, value, time.perf_counter_ns() - start_ns
+        )
+
+    def read_block(self, address: int, count: int) -> bytes:
+        start_ns = time.perf_counter_ns()
+        values = self.backend.read_block(address, count)
+        duration_ns = (time.perf_counter_ns() - start_ns) // max(count, 1)
+        for offset, value in enumerate(values):
+            self._instrumentation.record_io(
+                "read", address + offset, value, duration_ns
+            )
+        return values
+
+
+def _bucket(duration_ns: int) -> int:
+    """Returns the histogram bucket for a duration"""
+    return min(max(duration_ns, 0).bit_length(), HISTOGRAM_BUCKETS - 1)
+
+
+# pylint: disable=too-many-instance-attributes
+class Instrumentation:
+    """Instruments a port, counting the register reads and writes per register
+    and per public method, recording the latency of each access and timing the
+    waits on BUSY (and on the ECP FIFO) in histograms.
+
+    Instrumentation works by replacing the port's backend with a wrapper while
+    enabled, so a port that is not instrumented pays nothing for it.  Anything
+    that bound the backend's functions before instrumentation was enabled,
+    such as a running :class:`parallel64.monitor.EdgeMonitor`, is not counted.
+    I/O is attributed to the outermost public method running in the thread
+    that performed it, or to ``None`` if there is none.  Several
+    instrumentations (and trace recorders) can be enabled on the same port at
+    once, and disabled in any order.
+
+    .. code-block::
+
+        import parallel64
+        port = parallel64.StandardPort(0x1234)
+        with port.instrument() as instrumentation:
+            port.write_spp_bytes(b"Hello world!")
+        print(instrumentation.snapshot())
+
+    :param _BasePort port: The port to instrument
+    :param hook: (optional) A function called for every register access and
+        wait with the kind of event (``"read"``, ``"write"``, ``"busy"`` or
+        ``"fifo"``), the address and value (both 0 for waits) and the duration
+        in nanoseconds.  It is called from the thread performing the I/O.
+    """
+
+    def __init__(
+        self,
+        port: "_BasePort",
+        hook: Optional[Callable[[str, int, int, int], None]] = None,
+    ) -> None:
+        self.port = port
+        self.hook = hook
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._backend: Optional[_InstrumentedBackend] = None
+        self._wrapped_methods: List[str] = []
+        self._registers: Dict[int, List[int]] = {}
+        self._methods: Dict[Optional[str], List[int]] = {}
+        self._latency = {
+            "read": [0] * HISTOGRAM_BUCKETS,
+            "write": [0] * HISTOGRAM_BUCKETS,
+        }
+        self._waits: Dict[str, List[int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the instrumentation is enabled"""
+        return self._backend is not None
+
+    def enable(self) -> None:
+        """Starts instrumenting the port"""
+
+        if self.enabled:
+            return
+        # pylint: disable=protected-access
+        self._backend = _InstrumentedBackend(self.port._backend, self)
+        self.port._backend = self._backend
+
+        port_type = type(self.port)
+        for name in dir(port_type):
+            attribute = inspect.getattr_static(port_type, name)
+            if not isinstance(attribute, FunctionType):
+                continue
+            method = getattr(self.port, name)
+            if name in _WAIT_METHODS:
+                wrapper = self._wrap_wait(method, _WAIT_METHODS[name])
+            elif name.startswith("_"):
+                continue
+            elif inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(
+                method
+            ):
+                continue
+            else:
+                wrapper = self._wrap_method(method, name)
+            setattr(self.port, name, wrapper)
+            self._wrapped_methods.append(name)
+
+    def disable(self) -> None:
+        """Stops instrumenting the port, keeping the statistics gathered"""
+
+        if not self.enabled:
+            return
+        # pylint: disable=protected-access
+        self.port._backend = unwrap_backend(self.port._backend, self._backend)
+        for name in self._wrapped_methods:
+            self._unwrap_method(name)
+        self._wrapped_methods = []
+        self._backend = None
+
+    def __enter__(self) -> "Instrumentation":
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.disable()
+
+    def reset(self) -> None:
+        """Resets all the statistics"""
+
+        with self._lock:
+            self._registers.clear()
+            self._methods.clear()
+            for histogram in self._latency.values():
+                histogram[:] = [0] * HISTOGRAM_BUCKETS
+            self._waits.clear()
+
+    def record_io(self, kind: str, address: int, value: int, duration_ns: int) -> None:
+        """Records a register access.  This is called by the instrumented
+        backend, but can also be used to record I/O performed another way.
+
+        :param str kind: Either ``"read"`` or ``"write"``
+        :param int address: The address of the register
+        :param int value: The byte read or written
+        :param int duration_ns: The duration of the access in nanoseconds
+        """
+
+        index = 0 if kind == "read" else 1
+        method = getattr(self._local, "method", None)
+        with self._lock:
+            self._registers.setdefault(address, [0, 0])[index] += 1
+            # Calls, reads, writes and total time spent in the method
+            self._methods.setdefault(method, [0, 0, 0, 0])[index + 1] += 1
+            self._latency[kind][_bucket(duration_ns)] += 1
+        if self.hook is not None:
+            self.hook(kind, address, value, duration_ns)
+
+    def snapshot(self) -> dict:
+        """Returns a copy of the statistics gathered so far as a dictionary with
+        the keys ``"registers"`` (reads and writes per register address),
+        ``"methods"`` (calls, reads, writes and total time per public method),
+        ``"latency_ns"`` (histograms of read and write durations) and
+        ``"waits"`` (histograms and totals of the BUSY and FIFO waits).  See
+        :const:`HISTOGRAM_BUCKETS` for the layout of the histograms.
+
+        :rtype: dict
+        """
+
+        with self._lock:
+            return {
+                "registers": {
+                    address: {"reads": reads, "writes": writes}
+                    for address, (reads, writes) in self._registers.items()
+                },
+                "methods": {
+                    method: {
+                        "calls": calls,
+                        "reads": reads,
+                        "writes": writes,
+                        "total_ns": total_ns,
+                    }
+                    for method, (
+                        calls,
+                        reads,
+                        writes,
+                        total_ns,
+                    ) in self._methods.items()
+                },
+                "latency_ns": {
+                    kind: list(histogram) for kind, histogram in self._latency.items()
+                },
+                "waits": {
+                    kind: {
+                        "count": waits[0],
+                        "total_ns": waits[1],
+                        "max_ns": waits[2],
+                        "histogram": waits[3:],
+                    }
+                    for kind, waits in self._waits.items()
+                },
+            }
+
+    def _wrap_method(self, method: Callable, name: str) -> Callable:
+        """Wraps a public method of the port to attribute its I/O to it"""
+
+        local = self._local
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if getattr(local, "method", None) is not None:
+                return wrapper.__wrapped__(*args, **kwargs)
+            local.method = name
+            start_ns = time.perf_counter_ns()
+            try:
+                return wrapper.__wrapped__(*args, **kwargs)
+            finally:
+                duration_ns = time.perf_counter_ns() - start_ns
+                local.method = None
+                with self._lock:
+                    counts = self._methods.setdefault(name, [0, 0, 0, 0])
+                    counts[0] += 1
+                    counts[3] += duration_ns
+
+        wrapper.instrumentation = self
+        return wrapper
+
+    def _wrap_wait(self, method: Callable, kind: str) -> Callable:
+        """Wraps a method of the port that waits, timing the waits"""
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start_ns = time.perf_counter_ns()
+            try:
+                return wrapper.__wrapped__(*args, **kwargs)
+            finally:
+                duration_ns = time.perf_counter_ns() - start_ns
+                with self._lock:
+                    # Count, total time, longest time and histogram
+                    waits = self._waits.setdefault(
+                        kind, [0, 0, 0] + [0] * HISTOGRAM_BUCKETS
+                    )
+                    waits[0] += 1
+                    waits[1] += duration_ns
+                    waits[2] = max(waits[2], duration_ns)
+                    waits[3 + _bucket(duration_ns)] += 1
+                if self.hook is not None:
+                    self.hook(kind, 0, 0, duration_ns)
+
+        wrapper.instrumentation = self
+        return wrapper
+
+    def _unwrap_method(self, name: str) -> None:
+        """Removes the wrapper of a method of the port, linking any wrapper
+        installed on top of it by another instrumentation to the method it
+        wraps
+        """
+
+        outer = None
+        current = self.port.__dict__.get(name)
+        while getattr(current, "instrumentation", None) is not None:
+            if current.instrumentation is self:
+                wrapped = current.__wrapped__
+                if outer is not None:
+                    outer.__wrapped__ = wrapped
+                elif getattr(wrapped, "instrumentation", None) is not None:
+                    setattr(self.port, name, wrapped)
+                else:
+                    delattr(self.port, name)
+                return
+            outer = current
+            current = current.__wrapped__
@@ -0,0 +1,251 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.monitor`
+
+Background monitoring of pins for edges, sampling all the pins on a
+register with a single read
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import threading
+import time
+from array import array
+from typing import TYPE_CHECKING, Callable, Iterable, List, NamedTuple, Optional
+from parallel64.pins import Pin
+from parallel64.timing import busy_wait_ns
+
+if TYPE_CHECKING:
+    from parallel64 import GPIOPort
+
+
+class EdgeEvent(NamedTuple):
+    """An edge detected on a pin
+
+    :param int timestamp_ns: The ``perf_counter_ns()`` timestamp of the sample
+        in which the edge was detected
+    :param Pin pin: The pin on which the edge occurred
+    :param bool rising: Whether the edge was rising (the pin went from low to
+        high, after accounting for hardware inversion) or falling
+    """
+
+    timestamp_ns: int
+    pin: Pin
+    rising: bool
+
+
+# pylint: disable=too-many-instance-attributes
+class EdgeMonitor:
+    """Monitors pins for edges from a dedicated thread, recording them in a
+    ring buffer allocated up front.  Each register involved is read once per
+    sample, and all of its monitored pins are decoded from that read.  If the
+    ring buffer fills up before the events are read, the oldest events are
+    overwritten and counted in ``overruns``.
+
+    Between samples, the thread sleeps by default, so the interval between
+    samples is only as accurate as the operating system's timers allow.  With
+    ``busy_wait`` enabled, the thread instead spins for the last couple of
+    milliseconds before each sample for accurate timing at high sampling
+    rates.  While spinning, it keeps a CPU core busy and holds the GIL for
+    most of the time, which slows down every other Python thread in the
+    process, so this is best left to processes that do little else.
+
+    .. code-block::
+
+        import parallel64
+        gpio = parallel64.GPIOPort(0x1234)
+        with gpio.monitor_edges([gpio.pins.ACK], sample_rate=500) as monitor:
+            ...
+        for event in monitor.read_events():
+            print(event.timestamp_ns, event.pin.pin_number, event.rising)
+
+    :param GPIOPort port: The port to monitor
+    :param pins: The pins to monitor, which should be Status pins or Data pins
+    :type pins: Iterable[Pin]
+    :param float sample_rate: (optional) The number of samples to take per
+        second, default is 1000, where 0 samples as fast as possible (which
+        spins like ``busy_wait``)
+    :param int buffer_size: (optional) The number of events the ring buffer
+        can hold, default is 4096
+    :param str edge: (optional) The edges to record, either ``"rising"``,
+        ``"falling"`` or ``"both"``, default is ``"both"``
+    :param callback: (optional) A function called with each
+        :class:`EdgeEvent` as it is detected.  It is called from the
+        monitoring thread, so it should return quickly to avoid lowering the
+        sampling rate.
+    :param bool busy_wait: (optional) Whether to busy-wait between samples
+        for accurate timing instead of sleeping, default is to sleep (False)
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        port: "GPIOPort",
+        pins: Iterable[Pin],
+        sample_rate: float = 1000,
+        buffer_size: int = 4096,
+        edge: str = "both",
+        callback: Optional[Callable[[EdgeEvent], None]] = None,
+        busy_wait: bool = False,
+    ) -> None:
+
+        if edge not in ("rising", "falling", "both"):
+            raise ValueError("The edge must be 'rising', 'falling' or 'both'")
+        self.port = port
+        self.pins = tuple(pins)
+        self.sample_rate = sample_rate
+        self.busy_wait = busy_wait
+        self.edge = edge
+        self.callback = callback
+
+        self._timestamps = array("q", bytes(8 * buffer_size))
+        self._pin_indices = array("B", bytes(buffer_size))
+        self._rising = array("B", bytes(buffer_size))
+        self._buffer_size = buffer_size
+        self._head = 0
+        self._count = 0
+        self._overruns = 0
+        self._buffer_lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the monitor is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def overruns(self) -> int:
+        """The number of events lost due to the ring buffer being full"""
+        return self._overruns
+
+    def start(self) -> None:
+        """Starts monitoring in a new thread"""
+
+        if self.running:
+            raise RuntimeError("The monitor is already running")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops monitoring, waiting for the monitoring thread to finish"""
+
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "EdgeMonitor":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def read_events(self, max_events: Optional[int] = None) -> List[EdgeEvent]:
+        """Removes events from the ring buffer and returns them, oldest first
+
+        :param int|None max_events: (optional) The maximum number of events to
+            return, default is to return all of them (None)
+        :rtype: list
+        """
+
+        with self._buffer_lock:
+            count = self._count
+            if max_events is not None:
+                count = min(count, max_events)
+            start = (self._head - self._count) % self._buffer_size
+            events = []
+            for offset in range(count):
+                index = (start + offset) % self._buffer_size
+                events.append(
+                    EdgeEvent(
+                        self._timestamps[index],
+                        self.pins[self._pin_indices[index]],
+                        bool(self._rising[index]),
+                    )
+                )
+            self._count -= count
+        return events
+
+    def _record(self, timestamp_ns: int, pin_index: int, rising: bool) -> None:
+        """Records an event in the ring buffer"""
+
+        with self._buffer_lock:
+            head = self._head
+            self._timestamps[head] = timestamp_ns
+            self._pin_indices[head] = pin_index
+            self._rising[head] = rising
+            self._head = (head + 1) % self._buffer_size
+            if self._count == self._buffer_size:
+                self._overruns += 1
+            else:
+                self._count += 1
+
+    # pylint: disable=too-many-locals
+    def _run(self) -> None:
+        """Samples the registers until stopped"""
+
+        read_byte = self.port.backend.read_byte
+        perf_counter_ns = time.perf_counter_ns
+        stop_event = self._stop_event
+        record_rising = self.edge in ("rising", "both")
+        record_falling = self.edge in ("falling", "both")
+
+        registers = {}
+        for pin_index, pin in enumerate(self.pins):
+            watch = registers.setdefault(pin.register, [0, []])
+            watch[0] |= pin.bit_mask
+            watch[1].append((pin_index, pin))
+        watches = [
+            (register, mask, tuple(register_pins))
+            for register, (mask, register_pins) in registers.items()
+        ]
+        previous = {register: read_byte(register) for register in registers}
+
+        interval_ns = int(1_000_000_000 / self.sample_rate) if self.sample_rate else 0
+        next_sample_ns = perf_counter_ns()
+        while not stop_event.is_set():
+            timestamp_ns = perf_counter_ns()
+            for register, mask, register_pins in watches:
+                value = read_byte(register)
+                changed = (value ^ previous[register]) & mask
+                if not changed:
+                    continue
+                previous[register] = value
+                for pin_index, pin in register_pins:
+                    if not changed & pin.bit_mask:
+                        continue
+                    rising = bool((value ^ pin.invert_mask) & pin.bit_mask)
+                    if (record_rising and rising) or (record_falling and not rising):
+                        self._record(timestamp_ns, pin_index, rising)
+                        if self.callback is not None:
+                            self.callback(EdgeEvent(timestamp_ns, pin, rising))
+
+            if interval_ns:
+                next_sample_ns += interval_ns
+                remaining_ns = next_sample_ns - perf_counter_ns()
+                if remaining_ns <= 0:
+                    # Fell behind, so skip the missed samples instead of bursting
+                    next_sample_ns = perf_counter_ns()
+                else:
+                    self._wait_until(next_sample_ns)
+
+    def _wait_until(self, deadline_ns: int) -> None:
+        """Waits until the time of the next sample, returning early if stopped"""
+
+        remaining_ns = deadline_ns - time.perf_counter_ns()
+        if not self.busy_wait:
+            self._stop_event.wait(remaining_ns / 1_000_000_000)
+            return
+        # Sleep until the last 2 milliseconds, then spin
+        if remaining_ns > 2_000_000:
+            self._stop_event.wait((remaining_ns - 2_000_000) / 1_000_000_000)
+        busy_wait_ns(deadline_ns - time.perf_counter_ns())
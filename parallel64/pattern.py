@@ -0,0 +1,172 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.pattern`
+
+Precompiled waveforms for the Data and Control registers, played back
+with deadline-based timing
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import time
+from array import array
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional, Tuple
+from parallel64.timing import wait_until_ns
+
+if TYPE_CHECKING:
+    from parallel64 import StandardPort
+
+_WRITE_DATA = 0b01
+_WRITE_CONTROL = 0b10
+
+
+class Pattern:
+    """A sequence of steps written to the Data and/or Control registers,
+    compiled into flat arrays once so that it can be played back repeatedly
+    with little overhead.
+
+    .. code-block::
+
+        # Two full steps of a stepper motor driver, 500 microseconds apart
+        pattern = Pattern([(0b0001, None, 500_000), (0b0010, None, 500_000)])
+        report = gpio.play_pattern(pattern, repeat=100)
+
+    :param steps: The steps of the pattern, each a tuple of the byte to write
+        to the Data register, the byte to write to the Control register and the
+        delay in nanoseconds before the next step.  Either byte can be ``None``
+        to leave that register unchanged for the step.
+    :type steps: Iterable[Tuple[int|None, int|None, int]]
+    :raises ValueError: If a step has a negative delay
+    """
+
+    def __init__(
+        self, steps: Iterable[Tuple[Optional[int], Optional[int], int]]
+    ) -> None:
+
+        self.data = array("B")
+        self.control = array("B")
+        self.flags = array("B")
+        self.offsets_ns = array("q")
+
+        offset_ns = 0
+        for data_byte, control_byte, delay_ns in steps:
+            if delay_ns < 0:
+                raise ValueError("Delays cannot be negative")
+            flags = 0
+            if data_byte is not None:
+                flags |= _WRITE_DATA
+            if control_byte is not None:
+                flags |= _WRITE_CONTROL
+            self.data.append(data_byte or 0)
+            self.control.append(control_byte or 0)
+            self.flags.append(flags)
+            self.offsets_ns.append(offset_ns)
+            offset_ns += delay_ns
+        self.period_ns = offset_ns
+
+    @classmethod
+    def from_data(cls, data: Iterable[int], delay_ns: int) -> "Pattern":
+        """Creates a pattern that writes each byte to the Data register, with a
+        fixed delay between them
+
+        :param data: The bytes to write
+        :type data: Iterable[int]
+        :param int delay_ns: The delay in nanoseconds between bytes
+        :rtype: Pattern
+        """
+        return cls((data_byte, None, delay_ns) for data_byte in data)
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+
+class PlaybackReport(NamedTuple):
+    """The timing of a pattern playback.  A step's lateness is how long after
+    its scheduled time it was written.
+
+    :param int steps: The number of steps written
+    :param int duration_ns: The total playback time in nanoseconds
+    :param int max_lateness_ns: The largest lateness of any step
+    :param float mean_lateness_ns: The average lateness of the steps
+    :param float jitter_ns: The standard deviation of the lateness of the steps
+    """
+
+    steps: int
+    duration_ns: int
+    max_lateness_ns: int
+    mean_lateness_ns: float
+    jitter_ns: float
+
+
+# pylint: disable=too-many-locals
+def play(
+    port: "StandardPort",
+    pattern: Pattern,
+    repeat: int = 1,
+    sleep_threshold_ns: int = 2_000_000,
+) -> PlaybackReport:
+    """Plays a pattern back on the port.  Each step is scheduled relative to the
+    start of the playback rather than the previous step, so timing errors do
+    not accumulate.  Steps are waited on by busy-waiting, except that waits
+    longer than ``sleep_threshold_ns`` sleep for all but the last part.
+
+    :param StandardPort port: The port to play the pattern on
+    :param Pattern pattern: The pattern to play
+    :param int repeat: (optional) The number of times to play the pattern,
+        default is once
+    :param int sleep_threshold_ns: (optional) The wait above which the thread
+        sleeps, default is 2 milliseconds
+    :return: The timing of the playback
+    :rtype: PlaybackReport
+    """
+
+    # pylint: disable=protected-access
+    write_byte = port.backend.write_byte
+    data_address = port._spp_data_address
+    control_address = port._control_address
+    perf_counter_ns = time.perf_counter_ns
+
+    steps = tuple(zip(pattern.flags, pattern.data, pattern.control, pattern.offsets_ns))
+    max_lateness_ns = 0
+    total_lateness_ns = 0
+    total_squared_lateness = 0
+
+    data_lock = port.get_register_lock(data_address)
+    control_lock = port.get_register_lock(control_address)
+    with data_lock, control_lock:
+        start_ns = perf_counter_ns()
+        for repetition in range(repeat):
+            period_start_ns = start_ns + repetition * pattern.period_ns
+            for flags, data_byte, control_byte, offset_ns in steps:
+                deadline_ns = period_start_ns + offset_ns
+                now_ns = wait_until_ns(deadline_ns, sleep_threshold_ns)
+                if flags & _WRITE_DATA:
+                    write_byte(data_address, data_byte)
+                if flags & _WRITE_CONTROL:
+                    write_byte(control_address, control_byte)
+                lateness_ns = now_ns - deadline_ns
+                max_lateness_ns = max(lateness_ns, max_lateness_ns)
+                total_lateness_ns += lateness_ns
+                total_squared_lateness += lateness_ns * lateness_ns
+        duration_ns = perf_counter_ns() - start_ns
+
+        if port.shadow_registers:
+            port.invalidate_shadow_registers()
+
+    step_count = len(steps) * repeat
+    if not step_count:
+        return PlaybackReport(0, duration_ns, 0, 0.0, 0.0)
+    mean_lateness_ns = total_lateness_ns / step_count
+    variance = total_squared_lateness / step_count - mean_lateness_ns**2
+    return PlaybackReport(
+        step_count,
+        duration_ns,
+        max_lateness_ns,
+        mean_lateness_ns,
+        max(variance, 0.0) ** 0.5,
+    )
@@ -13,12 +13,33 @@ of a GPIO port
 
 """
 
+import re
 import threading
-from typing import List, Tuple
+from array import array
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
 
+# pylint: disable=too-many-instance-attributes
 class Pin:
-    """Class representing a pin"""
+    """Class representing a pin
+
+    :ivar int bit_mask: The mask for the pin's bit in its register
+    :ivar int invert_mask: The mask to XOR with the register to undo any
+        hardware inversion, equal to ``bit_mask`` if the pin is hardware
+        inverted and 0 otherwise
+    """
+
+    __slots__ = (
+        "pin_number",
+        "bit_index",
+        "register",
+        "bit_mask",
+        "invert_mask",
+        "_hw_inverted",
+        "_allow_input",
+        "_allow_output",
+    )
 
     def __init__(
         self, pin_number: int, bit_index: int, register: int, hw_inverted: bool = False
@@ -26,6 +47,8 @@ class Pin:
         self.pin_number = pin_number
         self.bit_index = bit_index
         self.register = register
+        self.bit_mask = 1 << bit_index
+        self.invert_mask = self.bit_mask if hw_inverted else 0
         self._hw_inverted = hw_inverted
         self._allow_input = None
         self._allow_output = None
@@ -48,13 +71,18 @@ class Pin:
 
 class DataPin(Pin):
     """Class representing an individual data pin, including a
-    class-wide threading.Lock for I/O operations
+    class-wide threading.Lock for I/O operations.  Note that this
+    lock is shared by every port, and is not used by
+    :class:`parallel64.GPIOPort`, which instead uses a lock per port
+    (see :meth:`parallel64.GPIOPort.get_register_lock`).
 
     :ivar register_lock: A class-wide thread lock useful for
         making I/O safe code
     :vartype register_lock: threading.Lock
     """
 
+    __slots__ = ()
+
     register_lock = threading.Lock()
 
     def __init__(
@@ -67,13 +95,18 @@ class DataPin(Pin):
 
 class StatusPin(Pin):
     """Class representing an individual status pin, including a
-    class-wide threading.Lock for I/O operations
+    class-wide threading.Lock for I/O operations.  Note that this
+    lock is shared by every port, and is not used by
+    :class:`parallel64.GPIOPort`, which instead uses a lock per port
+    (see :meth:`parallel64.GPIOPort.get_register_lock`).
 
     :ivar register_lock: A class-wide thread lock useful for
         making I/O safe code
     :vartype register_lock: threading.Lock
     """
 
+    __slots__ = ()
+
     register_lock = threading.Lock()
 
     def __init__(
@@ -86,13 +119,18 @@ class StatusPin(Pin):
 
 class ControlPin(Pin):
     """Class representing an individual control pin, including a
-    class-wide threading.Lock for I/O operations
+    class-wide threading.Lock for I/O operations.  Note that this
+    lock is shared by every port, and is not used by
+    :class:`parallel64.GPIOPort`, which instead uses a lock per port
+    (see :meth:`parallel64.GPIOPort.get_register_lock`).
 
     :ivar register_lock: A class-wide thread lock useful for
         making I/O safe code
     :vartype register_lock: threading.Lock
     """
 
+    __slots__ = ()
+
     register_lock = threading.Lock()
 
     def __init__(
@@ -124,6 +162,15 @@ class Pins:
 
     Control Pins:
     STROBE, AUTO_LINEFEED, INITIALIZE, SELECT_PRINTER
+
+    The pins are indexed when the object is created, so looking them up by
+    number, name or register takes constant time.
+
+    Raw register bytes, such as those from a :class:`parallel64.capture.Capture`,
+    can be decoded into per-pin signals in bulk using ``decode()`` and
+    ``decode_edges()``.  These accept NumPy arrays, in which case NumPy is used
+    to decode them, or any other buffer of bytes, such as ``bytes`` or
+    ``array('B')``, in which case lookup tables are used.
     """
 
     def __init__(self, data_address: int, is_bidir: bool) -> None:
@@ -147,20 +194,183 @@ class Pins:
         self.D6 = DataPin(8, 6, data_address, is_bidir)
         self.D7 = DataPin(9, 7, data_address, is_bidir)
 
-    @property
-    def pin_list(self) -> List[Tuple[str, Pin]]:
-        """Returns a list of pins and their names"""
-        return [
+        self._pin_table: Tuple[Tuple[str, Pin], ...] = tuple(
             (pin_name, pin)
             for pin_name, pin in self.__dict__.items()
             if isinstance(pin, Pin)
-        ]
+        )
+        self._pins_by_name: Mapping[str, Pin] = MappingProxyType(dict(self._pin_table))
+        self._names_by_pin: Mapping[Pin, str] = MappingProxyType(
+            {pin: pin_name for pin_name, pin in self._pin_table}
+        )
+        self._pins_by_number: Mapping[int, Pin] = MappingProxyType(
+            {pin.pin_number: pin for _, pin in self._pin_table}
+        )
+        pins_by_register = {}
+        for _, pin in self._pin_table:
+            pins_by_register.setdefault(pin.register, []).append(pin)
+        self._pins_by_register: Mapping[int, Tuple[Pin, ...]] = MappingProxyType(
+            {register: tuple(pins) for register, pins in pins_by_register.items()}
+        )
+
+    @property
+    def pin_list(self) -> List[Tuple[str, Pin]]:
+        """Returns a list of pins and their names"""
+        return list(self._pin_table)
 
     def get_pin_number(self, pin_number: int) -> Pin:
         """Returns a pin based off of the pin number
 
         :rtype: Pin
         """
-        if not 1 <= pin_number <= 17:
-            raise ValueError("Only pins 1-17 are accessible")
-        return [pin for _, pin in self.pin_list if pin.pin_number == pin_number][0]
+        try:
+            return self._pins_by_number[pin_number]
+        except KeyError as err:
+            raise ValueError("Only pins 1-17 are accessible") from err
+
+    def get_pin_name(self, pin_name: str) -> Pin:
+        """Returns a pin based off of its name (e.g. ``"D0"`` or ``"BUSY"``)
+
+        :rtype: Pin
+        :raises ValueError: If there is no pin with the given name
+        """
+        try:
+            return self._pins_by_name[pin_name]
+        except KeyError as err:
+            raise ValueError(f"There is no pin named {pin_name}") from err
+
+    def get_register_pins(self, register: int) -> Tuple[Pin, ...]:
+        """Returns the pins connected to the register at the given address
+
+        :param int register: The address of the register
+        :rtype: tuple
+        """
+        return self._pins_by_register.get(register, ())
+
+    def get_name(self, pin: Pin) -> str:
+        """Returns the name of the given pin (e.g. ``"D0"`` or ``"BUSY"``)
+
+        :rtype: str
+        """
+        return self._names_by_pin[pin]
+
+    def decode(
+        self,
+        raw,
+        pins: Optional[Iterable[Pin]] = None,
+        register: Optional[int] = None,
+        as_matrix: bool = False,
+    ):
+        """Decodes raw bytes sampled from a single register into the states of
+        its pins, accounting for hardware inversion
+
+        :param raw: The register bytes, as a NumPy array or any object
+            supporting the buffer protocol
+        :param pins: (optional) The pins to decode, which must all be connected
+            to the same register, default is all the pins connected to
+            ``register``
+        :type pins: Iterable[Pin]|None
+        :param int|None register: (optional) The address of the register the
+            bytes were sampled from, used when ``pins`` is not given
+        :param bool as_matrix: (optional) Whether to return a NumPy boolean
+            matrix with a row per sample and a column per pin instead of a
+            dictionary, default is to return a dictionary (False).  This
+            requires NumPy to be installed.
+        :return: A dictionary with each pin's signal keyed by pin name, where
+            the signals are NumPy boolean arrays for NumPy input and ``bytes``
+            of 0s and 1s otherwise, or a matrix if ``as_matrix`` is True
+        :raises ValueError: If the pins are not all connected to one register
+        """
+
+        pins = self._resolve_register_pins(pins, register)
+
+        if _is_numpy_array(raw) or as_matrix:
+            import numpy  # pylint: disable=import-outside-toplevel
+
+            if _is_numpy_array(raw):
+                samples = numpy.asarray(raw, dtype=numpy.uint8)
+            else:
+                samples = numpy.frombuffer(raw, dtype=numpy.uint8)
+            masks = numpy.array([pin.bit_mask for pin in pins], dtype=numpy.uint8)
+            inverts = numpy.array([pin.invert_mask for pin in pins], dtype=numpy.uint8)
+            matrix = ((samples[:, None] ^ inverts) & masks) != 0
+            if as_matrix:
+                return matrix
+            return {
+                self._names_by_pin[pin]: matrix[:, column]
+                for column, pin in enumerate(pins)
+            }
+
+        samples = bytes(raw)
+        return {
+            self._names_by_pin[pin]: samples.translate(_decode_table(pin))
+            for pin in pins
+        }
+
+    # pylint: disable=no-self-use
+    def decode_edges(self, raw, pin: Pin) -> Tuple:
+        """Finds the edges of a pin in raw bytes sampled from its register
+
+        :param raw: The register bytes, as a NumPy array or any object
+            supporting the buffer protocol
+        :param Pin pin: The pin to find the edges of
+        :return: The sample indices at which the pin rose and fell, as NumPy
+            arrays for NumPy input and ``array('q')`` otherwise
+        :rtype: tuple
+        """
+
+        if _is_numpy_array(raw):
+            import numpy  # pylint: disable=import-outside-toplevel
+
+            signal = (
+                (numpy.asarray(raw, dtype=numpy.uint8) ^ pin.invert_mask) & pin.bit_mask
+            ) != 0
+            transitions = numpy.diff(signal.astype(numpy.int8))
+            return (
+                numpy.flatnonzero(transitions == 1) + 1,
+                numpy.flatnonzero(transitions == -1) + 1,
+            )
+
+        signal = bytes(raw).translate(_decode_table(pin))
+        rising = array("q", (match.start() + 1 for match in _RISING.finditer(signal)))
+        falling = array("q", (match.start() + 1 for match in _FALLING.finditer(signal)))
+        return rising, falling
+
+    def _resolve_register_pins(
+        self, pins: Optional[Iterable[Pin]], register: Optional[int]
+    ) -> Tuple[Pin, ...]:
+        """Returns the pins to decode, checking they share a register"""
+
+        if pins is None:
+            if register is None:
+                raise ValueError("Either the pins or the register must be given")
+            pins = self.get_register_pins(register)
+        pins = tuple(pins)
+        if len({pin.register for pin in pins}) > 1:
+            raise ValueError("The pins must all be connected to the same register")
+        return pins
+
+
+_RISING = re.compile(b"\x00\x01")
+_FALLING = re.compile(b"\x01\x00")
+_decode_tables: Dict[Tuple[int, int], bytes] = {}
+
+
+def _decode_table(pin: Pin) -> bytes:
+    """Returns a translation table mapping each register byte to the state of
+    the given pin as a 0 or 1
+    """
+
+    key = (pin.bit_mask, pin.invert_mask)
+    table = _decode_tables.get(key)
+    if table is None:
+        table = bytes(
+            1 if (value ^ pin.invert_mask) & pin.bit_mask else 0 for value in range(256)
+        )
+        _decode_tables[key] = table
+    return table
+
+
+def _is_numpy_array(obj) -> bool:
+    """Returns whether the object is a NumPy array, without importing NumPy"""
+    return type(obj).__module__ == "numpy" and hasattr(obj, "ndim")
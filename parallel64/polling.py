@@ -0,0 +1,155 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.polling`
+
+Strategies for polling the port while waiting on a condition, such
+as the Busy line clearing, with bounded waits and CPU-friendly backoff
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Union
+
+
+class PollingStats:
+    """Statistics about the waits performed using a :class:`PollingStrategy`
+
+    :ivar int waits: The number of waits performed
+    :ivar int timeouts: The number of waits that timed out
+    :ivar int polls: The total number of times the condition was checked
+    :ivar int total_wait_ns: The total time spent waiting in nanoseconds
+    :ivar int max_wait_ns: The longest single wait in nanoseconds
+    """
+
+    def __init__(self) -> None:
+        self.waits = 0
+        self.timeouts = 0
+        self.polls = 0
+        self.total_wait_ns = 0
+        self.max_wait_ns = 0
+
+    @property
+    def mean_wait_ns(self) -> float:
+        """The average duration of a wait in nanoseconds"""
+        return self.total_wait_ns / self.waits if self.waits else 0.0
+
+    def reset(self) -> None:
+        """Resets all the statistics"""
+        self.waits = 0
+        self.timeouts = 0
+        self.polls = 0
+        self.total_wait_ns = 0
+        self.max_wait_ns = 0
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        """Returns the statistics as a dictionary
+
+        :rtype: dict
+        """
+        return {
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "polls": self.polls,
+            "total_wait_ns": self.total_wait_ns,
+            "max_wait_ns": self.max_wait_ns,
+            "mean_wait_ns": self.mean_wait_ns,
+        }
+
+
+# pylint: disable=too-few-public-methods
+class PollingStrategy:
+    """A strategy for waiting on a condition by polling it.  The condition is
+    first polled continuously, then polled while yielding the CPU to other
+    threads between checks, and finally polled with sleeps in between that
+    double in length up to a maximum.  Short waits therefore have low latency
+    while long waits use little CPU time.
+
+    A single strategy can be shared between ports and threads, in which case
+    the statistics cover all of them.
+
+    :param float|None timeout: (optional) The maximum time in seconds to wait,
+        default is to wait indefinitely (None)
+    :param int spin_polls: (optional) The number of polls performed back to
+        back before yielding, default is 1000
+    :param int yield_polls: (optional) The number of polls performed while
+        yielding the CPU between them before sleeping, default is 100
+    :param float sleep_interval: (optional) The initial sleep between polls in
+        seconds, default is 0.0001
+    :param float max_sleep_interval: (optional) The maximum sleep between polls
+        in seconds, default is 0.01
+
+    :ivar PollingStats stats: The statistics of the waits performed
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        spin_polls: int = 1000,
+        yield_polls: int = 100,
+        sleep_interval: float = 0.0001,
+        max_sleep_interval: float = 0.01,
+    ) -> None:
+        self.timeout = timeout
+        self.spin_polls = spin_polls
+        self.yield_polls = yield_polls
+        self.sleep_interval = sleep_interval
+        self.max_sleep_interval = max_sleep_interval
+        self.stats = PollingStats()
+        self._stats_lock = threading.Lock()
+
+    def wait(self, condition: Callable[[], bool]) -> bool:
+        """Waits for the condition to become true
+
+        :param condition: A function that returns whether the condition is met
+        :return: Whether the condition was met before timing out
+        :rtype: bool
+        """
+
+        perf_counter_ns = time.perf_counter_ns
+        start_ns = perf_counter_ns()
+        if self.timeout is None:
+            deadline_ns = None
+        else:
+            deadline_ns = start_ns + int(self.timeout * 1_000_000_000)
+
+        polls = 0
+        met = False
+        sleep_interval = self.sleep_interval
+        while True:
+            polls += 1
+            if condition():
+                met = True
+                break
+            now_ns = perf_counter_ns()
+            if deadline_ns is not None and now_ns >= deadline_ns:
+                break
+            if polls <= self.spin_polls:
+                continue
+            if polls <= self.spin_polls + self.yield_polls:
+                time.sleep(0)
+                continue
+            if deadline_ns is not None:
+                sleep_interval = min(
+                    sleep_interval, (deadline_ns - now_ns) / 1_000_000_000
+                )
+            time.sleep(sleep_interval)
+            sleep_interval = min(sleep_interval * 2, self.max_sleep_interval)
+
+        wait_ns = perf_counter_ns() - start_ns
+        with self._stats_lock:
+            stats = self.stats
+            stats.waits += 1
+            stats.polls += polls
+            stats.total_wait_ns += wait_ns
+            stats.max_wait_ns = max(wait_ns, stats.max_wait_ns)
+            if not met:
+                stats.timeouts += 1
+        return met
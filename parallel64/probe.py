@@ -0,0 +1,342 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.probe`
+
+Probing of port capabilities, with the results cached per base address
+in-process and optionally in a profile file on disk
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional, Tuple
+from parallel64.constants import CommMode
+
+if TYPE_CHECKING:
+    from parallel64.backends import Backend
+
+
+class PortCapabilities(NamedTuple):
+    """The capabilities of a port, as found by :func:`probe`
+
+    :param bool bidirectional: Whether the data lines support the reverse
+        direction
+    :param bool epp: Whether the port has the EPP registers
+    :param bool ecr: Whether the port has an Extended Capabilities Register
+    :param comm_modes: The communication modes the port supports
+    :type comm_modes: Tuple[CommMode, ...]
+    """
+
+    bidirectional: bool
+    epp: bool
+    ecr: bool
+    comm_modes: Tuple[CommMode, ...]
+
+    def to_dict(self) -> dict:
+        """Returns the capabilities as a dictionary that can be stored as JSON
+
+        :rtype: dict
+        """
+        return {
+            "bidirectional": self.bidirectional,
+            "epp": self.epp,
+            "ecr": self.ecr,
+            "comm_modes": [mode.name for mode in self.comm_modes],
+        }
+
+    @classmethod
+    def from_dict(cls, contents: dict) -> "PortCapabilities":
+        """Creates capabilities from a dictionary made by ``to_dict()``
+
+        :param dict contents: The dictionary of capabilities
+        :rtype: PortCapabilities
+        """
+        return cls(
+            bool(contents["bidirectional"]),
+            bool(contents["epp"]),
+            bool(contents["ecr"]),
+            tuple(CommMode[name] for name in contents["comm_modes"]),
+        )
+
+
+# Results are cached per backend so that simulated ports at the same address
+# do not share results with each other or with the hardware, and by both base
+# addresses so that results probed without an ECP base address are not reused
+# when one is given
+_CacheKey = Tuple[int, Optional[int]]
+_CachedCapabilities = Dict[_CacheKey, PortCapabilities]
+_capabilities: "weakref.WeakKeyDictionary[Backend, _CachedCapabilities]" = (
+    weakref.WeakKeyDictionary()
+)
+_bidirectional: "weakref.WeakKeyDictionary[Backend, Dict[int, bool]]" = (
+    weakref.WeakKeyDictionary()
+)
+_cache_lock = threading.Lock()
+
+
+def probe(
+    backend: "Backend", spp_base_address: int, ecp_base_address: Optional[int] = None
+) -> PortCapabilities:
+    """Probes the capabilities of a port, leaving its registers as they were
+    found.  Probing toggles the direction bit and performs an EPP cycle, so it
+    should be done while the port is idle.  The results are not cached; use
+    :func:`get_capabilities` for cached results.
+
+    :param Backend backend: The backend used to access the registers
+    :param int spp_base_address: The SPP base address of the port
+    :param int|None ecp_base_address: (optional) The ECP base address of the
+        port, default is not to probe for an ECR (None)
+    :rtype: PortCapabilities
+    """
+
+    bidirectional = _probe_bidirectional(backend, spp_base_address)
+    epp = _probe_epp(backend, spp_base_address)
+
+    comm_modes = [CommMode.SPP]
+    if bidirectional:
+        comm_modes.append(CommMode.BYTE)
+    if epp:
+        comm_modes.append(CommMode.EPP)
+    ecr = False
+    if ecp_base_address is not None:
+        ecr = _probe_ecr(backend, ecp_base_address)
+        if ecr:
+            comm_modes.extend(_probe_ecr_modes(backend, ecp_base_address))
+    comm_modes.sort(key=lambda mode: mode.value)
+
+    return PortCapabilities(bidirectional, epp, ecr, tuple(comm_modes))
+
+
+def get_capabilities(
+    backend: "Backend",
+    spp_base_address: int,
+    ecp_base_address: Optional[int] = None,
+    reprobe: bool = False,
+) -> PortCapabilities:
+    """Returns the capabilities of a port, probing it only if they are not
+    already cached for the backend and base addresses
+
+    :param Backend backend: The backend used to access the registers
+    :param int spp_base_address: The SPP base address of the port
+    :param int|None ecp_base_address: (optional) The ECP base address of the
+        port, default is not to probe for an ECR (None)
+    :param bool reprobe: (optional) Whether to probe the port even if the
+        capabilities are cached, default is not to (False)
+    :rtype: PortCapabilities
+    """
+
+    key = (spp_base_address, ecp_base_address)
+    with _cache_lock:
+        cached = _capabilities.setdefault(backend, {})
+        if not reprobe and key in cached:
+            return cached[key]
+    capabilities = probe(backend, spp_base_address, ecp_base_address)
+    with _cache_lock:
+        cached[key] = capabilities
+        _bidirectional.setdefault(backend, {})[
+            spp_base_address
+        ] = capabilities.bidirectional
+    return capabilities
+
+
+def is_bidirectional(
+    backend: "Backend", spp_base_address: int, reprobe: bool = False
+) -> bool:
+    """Returns whether a port is bidirectional, only toggling the direction bit
+    if this is not already cached for the backend and base address
+
+    :param Backend backend: The backend used to access the registers
+    :param int spp_base_address: The SPP base address of the port
+    :param bool reprobe: (optional) Whether to probe the port even if the result
+        is cached, default is not to (False)
+    :rtype: bool
+    """
+
+    with _cache_lock:
+        cached = _bidirectional.setdefault(backend, {})
+        if not reprobe and spp_base_address in cached:
+            return cached[spp_base_address]
+    bidirectional = _probe_bidirectional(backend, spp_base_address)
+    with _cache_lock:
+        cached[spp_base_address] = bidirectional
+    return bidirectional
+
+
+def clear_cache(backend: Optional["Backend"] = None) -> None:
+    """Clears the cached capabilities
+
+    :param Backend|None backend: (optional) The backend to clear the cached
+        capabilities of, default is to clear them for every backend (None)
+    """
+
+    with _cache_lock:
+        if backend is None:
+            _capabilities.clear()
+            _bidirectional.clear()
+        else:
+            _capabilities.pop(backend, None)
+            _bidirectional.pop(backend, None)
+
+
+def profile_path(json_filepath: str) -> str:
+    """Returns the path of the capability profile kept next to a JSON config
+    file, which has the same name with a ``.profile.json`` extension
+
+    :param str json_filepath: The path to the JSON config file
+    :rtype: str
+    """
+    return os.path.splitext(json_filepath)[0] + ".profile.json"
+
+
+def load_profile(json_filepath: str, backend: "Backend") -> bool:
+    """Loads the capability profile kept next to a JSON config file into the
+    cache for the backend, if the profile exists.  Capabilities already cached
+    are kept.
+
+    :param str json_filepath: The path to the JSON config file
+    :param Backend backend: The backend the profile applies to
+    :return: Whether a profile was loaded
+    :rtype: bool
+    """
+
+    filepath = profile_path(json_filepath)
+    if not os.path.exists(filepath):
+        return False
+
+    import json  # pylint: disable=import-outside-toplevel
+
+    with open(filepath, mode="r", encoding="utf-8") as profile_file:
+        profile: Dict[str, dict] = json.load(profile_file)
+
+    with _cache_lock:
+        cached = _capabilities.setdefault(backend, {})
+        cached_bidirectional = _bidirectional.setdefault(backend, {})
+        for addresses, contents in profile.items():
+            capabilities = PortCapabilities.from_dict(contents)
+            key = _parse_profile_key(addresses)
+            cached.setdefault(key, capabilities)
+            cached_bidirectional.setdefault(key[0], capabilities.bidirectional)
+    return True
+
+
+def save_profile(json_filepath: str, backend: "Backend") -> str:
+    """Saves the capabilities cached for the backend to the profile kept next
+    to a JSON config file, adding to any capabilities already in it
+
+    :param str json_filepath: The path to the JSON config file
+    :param Backend backend: The backend whose cached capabilities are saved
+    :return: The path of the profile
+    :rtype: str
+    """
+
+    import json  # pylint: disable=import-outside-toplevel
+
+    filepath = profile_path(json_filepath)
+    profile: Dict[str, dict] = {}
+    if os.path.exists(filepath):
+        with open(filepath, mode="r", encoding="utf-8") as profile_file:
+            profile = json.load(profile_file)
+
+    with _cache_lock:
+        for key, capabilities in _capabilities.get(backend, {}).items():
+            profile[_format_profile_key(key)] = capabilities.to_dict()
+
+    with open(filepath, mode="w", encoding="utf-8") as profile_file:
+        json.dump(profile, profile_file, indent=4)
+    return filepath
+
+
+def _format_profile_key(key: _CacheKey) -> str:
+    """Formats the base addresses of a port as a key of a profile, which is the
+    SPP base address followed by the ECP base address if one was probed
+    """
+    spp_base_address, ecp_base_address = key
+    if ecp_base_address is None:
+        return f"0x{spp_base_address:X}"
+    return f"0x{spp_base_address:X}/0x{ecp_base_address:X}"
+
+
+def _parse_profile_key(addresses: str) -> _CacheKey:
+    """Parses a key of a profile made by ``_format_profile_key()``"""
+    spp_address, _, ecp_address = addresses.partition("/")
+    return int(spp_address, 16), int(ecp_address, 16) if ecp_address else None
+
+
+def _probe_bidirectional(backend: "Backend", spp_base_address: int) -> bool:
+    """Tests whether the direction bit of the Control register can be set"""
+
+    control_address = spp_base_address + 2
+    control_byte = backend.read_byte(control_address)
+    backend.write_byte(control_address, control_byte | 0b00100000)
+    bidirectional = bool(backend.read_byte(control_address) & 0b00100000)
+    backend.write_byte(control_address, control_byte)
+    return bidirectional
+
+
+def _probe_epp(backend: "Backend", spp_base_address: int) -> bool:
+    """Tests for the EPP registers by performing an EPP Address Read Cycle.  A
+    port with EPP either completes the cycle or sets the EPP timeout bit, while
+    a port without it reads back the floating bus.
+    """
+
+    status_address = spp_base_address + 1
+    backend.write_byte(status_address, 0b00000001)
+    if backend.read_byte(status_address) & 0b00000001:
+        return False
+    epp_address = backend.read_byte(spp_base_address + 3)
+    timed_out = bool(backend.read_byte(status_address) & 0b00000001)
+    backend.write_byte(status_address, 0b00000001)
+    return timed_out or epp_address != 0xFF
+
+
+def _probe_ecr(backend: "Backend", ecp_base_address: int) -> bool:
+    """Tests for an ECR, which should report an empty FIFO and keep the bits
+    written to it
+    """
+
+    ecr_address = ecp_base_address + 2
+    try:
+        ecr_byte = backend.read_byte(ecr_address)
+    except (OSError, ValueError):
+        return False
+    if ecr_byte & 0b00000011 != 0b00000001:
+        return False
+
+    backend.write_byte(ecr_address, 0b00110100)
+    present = backend.read_byte(ecr_address) == 0b00110101
+    backend.write_byte(ecr_address, ecr_byte)
+    return present
+
+
+def _probe_ecr_modes(backend: "Backend", ecp_base_address: int) -> Tuple:
+    """Tests for the FIFO and configuration modes of a port with an ECR"""
+
+    fifo_address = ecp_base_address
+    ecr_address = ecp_base_address + 2
+    ecr_byte = backend.read_byte(ecr_address)
+    other_bits = ecr_byte & 0b00011100
+    modes = []
+
+    # A byte written to the FIFO in FIFO test mode should stay there
+    backend.write_byte(ecr_address, other_bits | CommMode.SPP.value << 5)
+    backend.write_byte(ecr_address, other_bits | CommMode.FIFO_TEST.value << 5)
+    backend.write_byte(fifo_address, 0x00)
+    if not backend.read_byte(ecr_address) & 0b00000001:
+        modes.extend((CommMode.SPP_FIFO, CommMode.ECP_FIFO, CommMode.FIFO_TEST))
+    backend.write_byte(ecr_address, other_bits | CommMode.SPP.value << 5)
+
+    # Configuration register A reports the implementation's word size
+    backend.write_byte(ecr_address, other_bits | CommMode.CONFIG.value << 5)
+    if (backend.read_byte(fifo_address) >> 4) & 0b111 in (0b000, 0b001, 0b010):
+        modes.append(CommMode.CONFIG)
+    backend.write_byte(ecr_address, other_bits | CommMode.SPP.value << 5)
+
+    backend.write_byte(ecr_address, ecr_byte)
+    return tuple(modes)
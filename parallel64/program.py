@@ -0,0 +1,327 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.program`
+
+Register programs: sequences of register operations compiled once and
+then run repeatedly by a small interpreter
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import threading
+import time
+from array import array
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from parallel64.timing import delay_ns
+
+if TYPE_CHECKING:
+    from parallel64 import _BasePort
+
+_WRITE = 0
+_WRITE_ARG = 1
+_READ = 2
+_MODIFY = 3
+_WAIT = 4
+_DELAY = 5
+
+_NO_TIMEOUT = -1
+
+
+class Program:
+    """A builder for a sequence of register operations, with registers given as
+    offsets from the port's base address.  Each method returns the program so
+    that calls can be chained, and ``compile()`` turns the result into a
+    :class:`CompiledProgram`.
+
+    .. code-block::
+
+        from parallel64.program import Program
+
+        # Write a byte via SPP, given as the first argument when run
+        send_byte = (
+            Program()
+            .wait_until(1, 0b10000000, 0b10000000, timeout=1)
+            .write_arg(0, 0)
+            .modify(2, 0b00000001, 0b00000001)
+            .delay(1000)
+            .modify(2, 0b00000001, 0b00000000)
+            .compile()
+            .bind(port)
+        )
+        for data_byte in b"Hello world!":
+            send_byte(data_byte)
+    """
+
+    def __init__(self) -> None:
+        self._steps: List[Tuple[int, int, int, int]] = []
+        self._slots = 0
+        self._args = 0
+
+    def write(self, offset: int, value: int) -> "Program":
+        """Adds a write of a fixed byte to a register
+
+        :param int offset: The offset of the register from the base address
+        :param int value: The byte to write
+        :rtype: Program
+        """
+        self._steps.append((_WRITE, offset, value & 0xFF, 0))
+        return self
+
+    def write_arg(self, offset: int, index: int) -> "Program":
+        """Adds a write of one of the arguments the program is run with to a
+        register
+
+        :param int offset: The offset of the register from the base address
+        :param int index: The index of the argument to write
+        :rtype: Program
+        """
+        self._steps.append((_WRITE_ARG, offset, index, 0))
+        self._args = max(self._args, index + 1)
+        return self
+
+    def read(self, offset: int, slot: int) -> "Program":
+        """Adds a read of a register, storing the byte read in a slot of the
+        result
+
+        :param int offset: The offset of the register from the base address
+        :param int slot: The index of the slot to store the byte in
+        :rtype: Program
+        """
+        self._steps.append((_READ, offset, slot, 0))
+        self._slots = max(self._slots, slot + 1)
+        return self
+
+    def modify(self, offset: int, mask: int, value: int) -> "Program":
+        """Adds a read-modify-write of a register, changing the masked bits to
+        those of the given value
+
+        :param int offset: The offset of the register from the base address
+        :param int mask: The mask for the bits to change
+        :param int value: The value of the bits to change
+        :rtype: Program
+        """
+        self._steps.append((_MODIFY, offset, ~mask & 0xFF, value & mask & 0xFF))
+        return self
+
+    def wait_until(
+        self,
+        offset: int,
+        mask: int,
+        expected: int,
+        timeout: Optional[float] = None,
+    ) -> "Program":
+        """Adds a wait until the masked bits of a register match the expected
+        value
+
+        :param int offset: The offset of the register from the base address
+        :param int mask: The mask for the bits to check
+        :param int expected: The expected value of the masked bits
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait, after which running the program raises a ``TimeoutError``,
+            default is to wait indefinitely (None)
+        :rtype: Program
+        """
+        timeout_ns = _NO_TIMEOUT if timeout is None else int(timeout * 1_000_000_000)
+        self._steps.append(
+            (_WAIT, offset, (mask & 0xFF) | (expected & mask & 0xFF) << 8, timeout_ns)
+        )
+        return self
+
+    def delay(self, duration_ns: int) -> "Program":
+        """Adds a delay
+
+        :param int duration_ns: The duration of the delay in nanoseconds
+        :rtype: Program
+        :raises ValueError: If the duration is negative
+        """
+        if duration_ns < 0:
+            raise ValueError("Delays cannot be negative")
+        self._steps.append((_DELAY, 0, duration_ns, 0))
+        return self
+
+    def compile(self) -> "CompiledProgram":
+        """Compiles the program into flat arrays
+
+        :rtype: CompiledProgram
+        """
+
+        opcodes = array("B")
+        offsets = array("h")
+        first_args = array("q")
+        second_args = array("q")
+        for opcode, offset, first_arg, second_arg in self._steps:
+            opcodes.append(opcode)
+            offsets.append(offset)
+            first_args.append(first_arg)
+            second_args.append(second_arg)
+        return CompiledProgram(
+            opcodes, offsets, first_args, second_args, self._slots, self._args
+        )
+
+
+# pylint: disable=too-few-public-methods
+class CompiledProgram:
+    """A compiled register program, stored as flat arrays with one entry per
+    operation.  These are typically created by ``Program.compile()``.
+
+    :param array.array opcodes: The operation codes
+    :param array.array offsets: The register offsets from the base address
+    :param array.array first_args: The first argument of each operation
+    :param array.array second_args: The second argument of each operation
+    :param int slots: The number of slots in the result
+    :param int args: The number of arguments the program is run with
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        opcodes: array,
+        offsets: array,
+        first_args: array,
+        second_args: array,
+        slots: int,
+        args: int,
+    ) -> None:
+        self.opcodes = opcodes
+        self.offsets = offsets
+        self.first_args = first_args
+        self.second_args = second_args
+        self.slots = slots
+        self.args = args
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def bind(
+        self, port: "_BasePort", base_address: Optional[int] = None
+    ) -> "BoundProgram":
+        """Binds the program to a port, resolving the register addresses and the
+        backend functions once so that it can be run repeatedly
+
+        :param _BasePort port: The port to run the program on
+        :param int|None base_address: (optional) The address the register
+            offsets are relative to, default is the port's SPP base address,
+            or the ECP base address for an :class:`parallel64.ExtendedPort`
+        :rtype: BoundProgram
+        """
+        return BoundProgram(self, port, base_address)
+
+
+class BoundProgram:
+    """A compiled register program bound to a port.  Calling it runs the
+    program, holding the port's locks for any registers it changes that have
+    one (see ``get_register_lock()``).
+
+    :param CompiledProgram program: The program
+    :param _BasePort port: The port to run the program on
+    :param int|None base_address: (optional) The address the register offsets
+        are relative to, default is the port's SPP base address, or the ECP
+        base address for an :class:`parallel64.ExtendedPort`
+    """
+
+    def __init__(
+        self,
+        program: CompiledProgram,
+        port: "_BasePort",
+        base_address: Optional[int] = None,
+    ) -> None:
+        if base_address is None:
+            # pylint: disable=protected-access
+            base_address = getattr(port, "_spp_data_address", None)
+            if base_address is None:
+                base_address = port._fifo_address
+        self.program = program
+        self.port = port
+        self.base_address = base_address
+
+        self._steps = tuple(
+            zip(
+                program.opcodes,
+                (base_address + offset for offset in program.offsets),
+                program.first_args,
+                program.second_args,
+            )
+        )
+        written = sorted(
+            {
+                address
+                for opcode, address, _, _ in self._steps
+                if opcode in (_WRITE, _WRITE_ARG, _MODIFY)
+            }
+        )
+        # Registers without a port lock, such as the EPP and FIFO registers, are
+        # only ever written by whole transfers, so there is nothing to hold
+        # pylint: disable=protected-access
+        self._locks: Tuple[threading.RLock, ...] = tuple(
+            port._register_locks[address]
+            for address in written
+            if address in port._register_locks
+        )
+        self._read_byte = port.backend.read_byte
+        self._write_byte = port.backend.write_byte
+
+    def __call__(self, *args: int, slots: Optional[bytearray] = None) -> bytearray:
+        """Runs the program
+
+        :param int args: The arguments used by ``write_arg()`` operations
+        :param bytearray|None slots: (optional) The buffer to store the bytes
+            read in, default is to create a new one
+        :return: The bytes read by ``read()`` operations, by slot
+        :rtype: bytearray
+        :raises ValueError: If too few arguments are given
+        :raises TimeoutError: If a wait times out
+        """
+
+        if len(args) < self.program.args:
+            raise ValueError(f"The program needs {self.program.args} arguments")
+        if slots is None:
+            slots = bytearray(self.program.slots)
+
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self._run(args, slots)
+        finally:
+            if self._locks and self.port.shadow_registers:
+                self.port.invalidate_shadow_registers()
+            for lock in reversed(self._locks):
+                lock.release()
+        return slots
+
+    def _run(self, args: Tuple[int, ...], slots: bytearray) -> None:
+        """Interprets the steps of the program"""
+
+        read_byte = self._read_byte
+        write_byte = self._write_byte
+        perf_counter_ns = time.perf_counter_ns
+        for opcode, address, first_arg, second_arg in self._steps:
+            if opcode == _WRITE:
+                write_byte(address, first_arg)
+            elif opcode == _MODIFY:
+                write_byte(address, (read_byte(address) & first_arg) | second_arg)
+            elif opcode == _WAIT:
+                mask = first_arg & 0xFF
+                expected = first_arg >> 8
+                if read_byte(address) & mask == expected:
+                    continue
+                if second_arg == _NO_TIMEOUT:
+                    while read_byte(address) & mask != expected:
+                        pass
+                    continue
+                deadline_ns = perf_counter_ns() + second_arg
+                while read_byte(address) & mask != expected:
+                    if perf_counter_ns() >= deadline_ns:
+                        raise TimeoutError(
+                            f"Timed out waiting on the register at 0x{address:X}"
+                        )
+            elif opcode == _WRITE_ARG:
+                write_byte(address, args[first_arg])
+            elif opcode == _READ:
+                slots[first_arg] = read_byte(address)
+            else:
+                delay_ns(first_arg)
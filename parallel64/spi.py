@@ -0,0 +1,359 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.spi`
+
+Bit-banged SPI and shift register support using the pins of a
+:class:`parallel64.GPIOPort`
+
+
+* Author(s): Alec Delaney
+
+"""
+
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional, Tuple
+from parallel64.pins import Pin
+from parallel64.timing import busy_wait_ns
+
+if TYPE_CHECKING:
+    from parallel64 import GPIOPort
+
+
+def _set_level(register_byte: int, pin: Pin, value: bool) -> int:
+    """Returns the register byte with the given pin set to the given level"""
+    register_byte &= ~pin.bit_mask & 0xFF
+    if bool(value) != pin.hw_inverted:
+        register_byte |= pin.bit_mask
+    return register_byte
+
+
+class _Frames(NamedTuple):
+    """The register bytes used for each clock edge of a transfer, computed once
+    per transfer
+    """
+
+    clock_register: int
+    # clock[bit][active] gives the clock register byte, where the bit is only
+    # used if MOSI shares the clock register
+    clock: Tuple[Tuple[int, int], Tuple[int, int]]
+    shared: bool
+    # The register and bytes for MOSI if it does not share the clock register
+    mosi_register: Optional[int]
+    mosi: Tuple[int, int]
+    # The register for MISO if data is being read in
+    miso_register: Optional[int]
+    miso_mask: int
+    miso_invert: int
+
+
+# pylint: disable=too-many-instance-attributes
+class BitBangSPI:
+    """A bit-banged SPI controller.  The register bytes needed for each clock
+    edge are computed once per transfer, and changes to pins sharing a register
+    are made with a single write, so each bit takes two register writes (plus
+    one read if MISO is used) when MOSI shares a register with the clock.
+
+    .. code-block::
+
+        import parallel64
+        from parallel64.spi import BitBangSPI
+
+        gpio = parallel64.GPIOPort(0x1234)
+        spi = BitBangSPI(
+            gpio,
+            gpio.pins.D0,
+            mosi=gpio.pins.D1,
+            miso=gpio.pins.ACK,
+            chip_select=gpio.pins.D2,
+        )
+        response = spi.transfer(b"\\x9f\\x00\\x00\\x00")
+
+    :param GPIOPort port: The port the pins belong to
+    :param Pin clock: The clock pin
+    :param Pin|None mosi: (optional) The pin for data out, default is no pin
+    :param Pin|None miso: (optional) The pin for data in, default is no pin
+    :param Pin|None chip_select: (optional) The chip select pin, default is no
+        pin
+    :param int mode: (optional) The SPI mode (0-3), default is 0
+    :param bool msb_first: (optional) Whether bytes are sent most significant
+        bit first, default is True
+    :param bool chip_select_active_low: (optional) Whether chip select is
+        active low, default is True
+    :param int half_period_ns: (optional) The minimum time in nanoseconds
+        between clock edges, default is 0 (as fast as possible)
+    :raises ValueError: If the mode is invalid
+    :raises OSError: If a pin does not allow the direction it is used for
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        port: "GPIOPort",
+        clock: Pin,
+        mosi: Optional[Pin] = None,
+        miso: Optional[Pin] = None,
+        chip_select: Optional[Pin] = None,
+        mode: int = 0,
+        msb_first: bool = True,
+        chip_select_active_low: bool = True,
+        half_period_ns: int = 0,
+    ) -> None:
+
+        if mode not in (0, 1, 2, 3):
+            raise ValueError("The SPI mode must be 0, 1, 2 or 3")
+        for pin in (clock, mosi, chip_select):
+            if pin is not None and not pin.output_allowed:
+                raise OSError("Output not allowed on pin " + str(pin.pin_number))
+        if miso is not None and not miso.input_allowed:
+            raise OSError("Input not allowed on pin " + str(miso.pin_number))
+
+        self.port = port
+        self.clock = clock
+        self.mosi = mosi
+        self.miso = miso
+        self.chip_select = chip_select
+        self.mode = mode
+        self.msb_first = msb_first
+        self.chip_select_active_low = chip_select_active_low
+        self.half_period_ns = half_period_ns
+
+    def write(self, buffer) -> None:
+        """Writes the given bytes, ignoring any data in
+
+        :param buffer: The bytes to write, as any object supporting the buffer
+            protocol
+        """
+        self._transfer(memoryview(buffer).cast("B"), None)
+
+    def transfer(self, buffer) -> bytearray:
+        """Writes the given bytes while reading the same number of bytes in
+
+        :param buffer: The bytes to write, as any object supporting the buffer
+            protocol
+        :return: The bytes read, which are all 0 if there is no MISO pin
+        :rtype: bytearray
+        """
+        data = memoryview(buffer).cast("B")
+        result = bytearray(len(data))
+        self._transfer(data, result if self.miso is not None else None)
+        return result
+
+    def readinto(self, buffer, write_value: int = 0) -> None:
+        """Reads bytes into the given buffer while writing a fixed value
+
+        :param buffer: The buffer to fill, as any writable object supporting
+            the buffer protocol
+        :param int write_value: (optional) The byte to write while reading,
+            default is 0
+        :raises ValueError: If there is no MISO pin
+        """
+        if self.miso is None:
+            raise ValueError("Reading requires a MISO pin")
+        result = memoryview(buffer).cast("B")
+        self._transfer(bytes([write_value]) * len(result), result)
+
+    def _transfer(self, data, result) -> None:
+        """Performs a transfer, storing the bytes read in ``result`` if given"""
+
+        # pylint: disable=protected-access
+        port = self.port
+        registers = {self.clock.register}
+        if self.mosi is not None:
+            registers.add(self.mosi.register)
+        if self.chip_select is not None:
+            registers.add(self.chip_select.register)
+        locks = [port.get_register_lock(register) for register in sorted(registers)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            images: Dict[int, int] = {
+                register: port._read_latch(register) for register in registers
+            }
+            images[self.clock.register] = _set_level(
+                images[self.clock.register], self.clock, bool(self.mode & 0b10)
+            )
+            self._set_chip_select(images, True)
+            for register, register_byte in images.items():
+                port.backend.write_byte(register, register_byte)
+
+            frames = self._compute_frames(images, result is not None)
+            if self.mode & 0b01:
+                last_bit, last_mosi = self._shift_sample_trailing(data, result, frames)
+            else:
+                last_bit, last_mosi = self._shift_sample_leading(data, result, frames)
+
+            # Return the clock to idle and release chip select
+            images[frames.clock_register] = frames.clock[last_bit][0]
+            if frames.mosi_register is not None and last_mosi != -1:
+                images[frames.mosi_register] = frames.mosi[last_mosi]
+            self._set_chip_select(images, False)
+            for register, register_byte in images.items():
+                port._write_latch(register, register_byte)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _set_chip_select(self, images: Dict[int, int], active: bool) -> None:
+        """Sets the level of the chip select pin, if any, in the register bytes"""
+        chip_select = self.chip_select
+        if chip_select is not None:
+            images[chip_select.register] = _set_level(
+                images[chip_select.register],
+                chip_select,
+                active != self.chip_select_active_low,
+            )
+
+    def _compute_frames(self, images: Dict[int, int], reading: bool) -> _Frames:
+        """Computes the register bytes for each clock edge from the current
+        register bytes
+        """
+
+        clock = self.clock
+        mosi = self.mosi
+        miso = self.miso
+        idle = bool(self.mode & 0b10)
+        shared = mosi is not None and mosi.register == clock.register
+
+        clock_frames = []
+        for bit in (0, 1):
+            base = images[clock.register]
+            if shared:
+                base = _set_level(base, mosi, bit)
+            clock_frames.append(
+                (_set_level(base, clock, idle), _set_level(base, clock, not idle))
+            )
+        mosi_register = None
+        mosi_frames = (0, 0)
+        if mosi is not None and not shared:
+            mosi_register = mosi.register
+            mosi_frames = (
+                _set_level(images[mosi_register], mosi, False),
+                _set_level(images[mosi_register], mosi, True),
+            )
+        reading = reading and miso is not None
+        return _Frames(
+            clock.register,
+            tuple(clock_frames),
+            shared,
+            mosi_register,
+            mosi_frames,
+            miso.register if reading else None,
+            miso.bit_mask if reading else 0,
+            miso.invert_mask if reading else 0,
+        )
+
+    # pylint: disable=too-many-locals
+    def _shift_sample_leading(self, data, result, frames: _Frames) -> Tuple[int, int]:
+        """Shifts the bytes through with data sampled on the leading clock edge
+        (modes 0 and 2), returning the last bit carried by the clock register
+        and the last bit written to a separate MOSI register (-1 if none)
+        """
+
+        write_byte = self.port.backend.write_byte
+        read_byte = self.port.backend.read_byte
+        half_period_ns = self.half_period_ns
+        clock_register = frames.clock_register
+        mosi_register = frames.mosi_register
+        miso_register = frames.miso_register
+        clock_bit = 0
+        last_mosi = -1
+        for index, out_byte in enumerate(data):
+            in_byte = 0
+            for shift in range(7, -1, -1) if self.msb_first else range(8):
+                bit = (out_byte >> shift) & 1
+                clock_bit = bit if frames.shared else 0
+                if mosi_register is not None and bit != last_mosi:
+                    write_byte(mosi_register, frames.mosi[bit])
+                    last_mosi = bit
+                write_byte(clock_register, frames.clock[clock_bit][0])
+                if half_period_ns:
+                    busy_wait_ns(half_period_ns)
+                write_byte(clock_register, frames.clock[clock_bit][1])
+                if miso_register is not None and (
+                    (read_byte(miso_register) ^ frames.miso_invert) & frames.miso_mask
+                ):
+                    in_byte |= 1 << shift
+                if half_period_ns:
+                    busy_wait_ns(half_period_ns)
+            if miso_register is not None:
+                result[index] = in_byte
+        return clock_bit, last_mosi
+
+    # pylint: disable=too-many-locals
+    def _shift_sample_trailing(self, data, result, frames: _Frames) -> Tuple[int, int]:
+        """Shifts the bytes through with data sampled on the trailing clock edge
+        (modes 1 and 3), returning the last bit carried by the clock register
+        and the last bit written to a separate MOSI register (-1 if none)
+        """
+
+        write_byte = self.port.backend.write_byte
+        read_byte = self.port.backend.read_byte
+        half_period_ns = self.half_period_ns
+        clock_register = frames.clock_register
+        mosi_register = frames.mosi_register
+        miso_register = frames.miso_register
+        clock_bit = 0
+        last_mosi = -1
+        for index, out_byte in enumerate(data):
+            in_byte = 0
+            for shift in range(7, -1, -1) if self.msb_first else range(8):
+                bit = (out_byte >> shift) & 1
+                clock_bit = bit if frames.shared else 0
+                write_byte(clock_register, frames.clock[clock_bit][1])
+                if mosi_register is not None and bit != last_mosi:
+                    write_byte(mosi_register, frames.mosi[bit])
+                    last_mosi = bit
+                if half_period_ns:
+                    busy_wait_ns(half_period_ns)
+                write_byte(clock_register, frames.clock[clock_bit][0])
+                if miso_register is not None and (
+                    (read_byte(miso_register) ^ frames.miso_invert) & frames.miso_mask
+                ):
+                    in_byte |= 1 << shift
+                if half_period_ns:
+                    busy_wait_ns(half_period_ns)
+            if miso_register is not None:
+                result[index] = in_byte
+        return clock_bit, last_mosi
+
+
+# pylint: disable=too-few-public-methods
+class ShiftRegister74HC595:
+    """A chain of 74HC595-style shift registers, with the serial data, shift
+    clock and storage (latch) clock connected to output pins.  Bytes are shifted
+    in using :class:`BitBangSPI` in mode 0 and then latched onto the outputs.
+
+    :param GPIOPort port: The port the pins belong to
+    :param Pin data: The pin connected to the serial data input (SER)
+    :param Pin clock: The pin connected to the shift register clock (SRCLK)
+    :param Pin latch: The pin connected to the storage register clock (RCLK)
+    :param bool msb_first: (optional) Whether bytes are shifted in most
+        significant bit first, default is True
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        port: "GPIOPort",
+        data: Pin,
+        clock: Pin,
+        latch: Pin,
+        msb_first: bool = True,
+    ) -> None:
+        self.port = port
+        self.latch = latch
+        self._spi = BitBangSPI(port, clock, mosi=data, msb_first=msb_first)
+
+    def write(self, buffer) -> None:
+        """Shifts the given bytes in and latches them onto the outputs.  For
+        chained shift registers, the first byte ends up in the last register
+        of the chain.
+
+        :param buffer: The bytes to write, as any object supporting the buffer
+            protocol
+        """
+        self._spi.write(buffer)
+        self.port.write_pin(self.latch, True)
+        self.port.write_pin(self.latch, False)
@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.stream`
+
+A raw binary stream over a port, so that it can be used wherever a
+file-like object is expected
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import io
+from typing import TYPE_CHECKING, Optional
+from parallel64.polling import PollingStrategy
+
+if TYPE_CHECKING:
+    from parallel64 import StandardPort
+
+
+class PortIO(io.RawIOBase):
+    """A raw binary stream over a :class:`parallel64.StandardPort` or
+    :class:`parallel64.EnhancedPort`.  Writes use block transfers, so the
+    stream can be wrapped in an ``io.BufferedWriter`` or copied into using
+    ``shutil.copyfileobj()`` to send large blocks of data at once.  Closing
+    the stream does not affect the port.  SPP has no handshake for reading
+    data, so only EPP streams are readable.
+
+    .. code-block::
+
+        import io
+        import shutil
+        import parallel64
+        from parallel64.stream import PortIO
+
+        port = parallel64.StandardPort(0x1234)
+        with open("job.prn", mode="rb") as job:
+            with io.BufferedWriter(PortIO(port), buffer_size=65536) as stream:
+                shutil.copyfileobj(job, stream)
+
+    :param StandardPort port: The port to read from and write to
+    :param str mode: (optional) The transfer mode, either ``"spp"``, ``"epp"``
+        or ``"auto"``, default is ``"auto"``, which uses EPP for an
+        :class:`parallel64.EnhancedPort` and SPP otherwise.  SPP writes use
+        ``write_spp_bytes()``, while EPP writes and reads use
+        ``write_epp_block()`` and ``readinto_epp_block()``.
+    :param float|None timeout: (optional) The maximum time in seconds to wait
+        for the Busy line to clear each time during SPP writes, default is to
+        wait indefinitely (None).  This is ignored if ``polling`` is given.
+    :param PollingStrategy|None polling: (optional) The strategy used to wait
+        on the Busy line during SPP writes, default is to poll continuously
+    :raises ValueError: If the mode is invalid, or is ``"epp"`` for a port
+        without EPP support
+    """
+
+    def __init__(
+        self,
+        port: "StandardPort",
+        mode: str = "auto",
+        timeout: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> None:
+        super().__init__()
+
+        has_epp = hasattr(port, "write_epp_block")
+        if mode == "auto":
+            mode = "epp" if has_epp else "spp"
+        if mode not in ("spp", "epp"):
+            raise ValueError("The mode must be 'spp', 'epp' or 'auto'")
+        if mode == "epp" and not has_epp:
+            raise ValueError("EPP mode requires an EnhancedPort")
+        if polling is None and timeout is not None:
+            polling = PollingStrategy(timeout)
+
+        self.port = port
+        self.mode = mode
+        self.polling = polling
+
+    def readable(self) -> bool:
+        """Whether the stream can be read from, which is only the case in EPP
+        mode
+
+        :rtype: bool
+        """
+        return self.mode == "epp"
+
+    def writable(self) -> bool:  # pylint: disable=no-self-use
+        """Whether the stream can be written to, which is always the case
+
+        :rtype: bool
+        """
+        return True
+
+    # The buffer argument is named b to match io.RawIOBase
+    # pylint: disable=invalid-name
+    def write(self, b) -> int:
+        """Writes a buffer of data to the port
+
+        :param b: The data to write, as any object supporting the buffer
+            protocol
+        :return: The number of bytes written
+        :rtype: int
+        :raises ValueError: If the stream is closed
+        :raises TimeoutError: If no bytes could be written before timing out,
+            or an EPP cycle timed out
+        """
+
+        self._checkClosed()
+        if self.mode == "epp":
+            self.port.write_epp_block(b)
+            return memoryview(b).nbytes
+        sent = self.port.write_spp_bytes(b, polling=self.polling)
+        if not sent and memoryview(b).nbytes:
+            raise TimeoutError("Timed out waiting for the port to not be busy")
+        return sent
+
+    def readinto(self, b) -> int:
+        """Reads data from the port into a buffer, filling it completely
+
+        :param b: The buffer to fill, as any writable object supporting the
+            buffer protocol
+        :return: The number of bytes read
+        :rtype: int
+        :raises ValueError: If the stream is closed
+        :raises io.UnsupportedOperation: If the stream uses SPP
+        :raises TimeoutError: If an EPP cycle timed out
+        """
+
+        self._checkClosed()
+        if not self.readable():
+            raise io.UnsupportedOperation("SPP streams cannot be read from")
+        self.port.readinto_epp_block(b)
+        return memoryview(b).nbytes
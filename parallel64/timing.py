@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.timing`
+
+Precise, short delays for timing signals on the port, which are far
+shorter than ``time.sleep()`` can reliably provide
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import time
+from typing import Optional
+
+_timer_overhead_ns: Optional[int] = None
+
+
+def calibrate(iterations: int = 1000) -> int:
+    """Measures the time taken to read the performance counter, which is
+    subtracted from busy-wait delays so they end closer to the requested
+    time.  This is performed automatically the first time a delay is used,
+    but can be repeated if the system load changes.
+
+    :param int iterations: (optional) The number of readings to average
+        over, default is 1000
+    :return: The measured overhead in nanoseconds
+    :rtype: int
+    """
+
+    global _timer_overhead_ns  # pylint: disable=global-statement,invalid-name
+
+    perf_counter_ns = time.perf_counter_ns
+    start_ns = perf_counter_ns()
+    for _ in range(iterations):
+        perf_counter_ns()
+    _timer_overhead_ns = (perf_counter_ns() - start_ns) // iterations
+    return _timer_overhead_ns
+
+
+def busy_wait_ns(duration_ns: int) -> None:
+    """Blocks for the given duration by spinning on the performance counter.
+    This keeps the CPU busy for the whole duration, so it is meant for delays
+    in the range of nanoseconds to microseconds.
+
+    :param int duration_ns: The duration in nanoseconds, where a duration of
+        0 or less returns immediately
+    """
+
+    if duration_ns <= 0:
+        return
+    overhead_ns = _timer_overhead_ns
+    if overhead_ns is None:
+        overhead_ns = calibrate()
+    perf_counter_ns = time.perf_counter_ns
+    deadline_ns = perf_counter_ns() + duration_ns - overhead_ns
+    while perf_counter_ns() < deadline_ns:
+        pass
+
+
+def wait_until_ns(deadline_ns: int, sleep_threshold_ns: int = 2_000_000) -> int:
+    """Blocks until the performance counter reaches the given time.  Waits
+    longer than ``sleep_threshold_ns`` sleep until half of the threshold is
+    left and busy-wait the rest, so that long waits leave the CPU free while
+    still ending close to the deadline.
+
+    :param int deadline_ns: The ``perf_counter_ns()`` time to wait until, where
+        a time already passed returns immediately
+    :param int sleep_threshold_ns: (optional) The wait above which the thread
+        sleeps, default is 2 milliseconds
+    :return: The ``perf_counter_ns()`` time at which the wait ended
+    :rtype: int
+    """
+
+    perf_counter_ns = time.perf_counter_ns
+    remaining_ns = deadline_ns - perf_counter_ns()
+    if remaining_ns > sleep_threshold_ns:
+        time.sleep((remaining_ns - sleep_threshold_ns // 2) / 1_000_000_000)
+    now_ns = perf_counter_ns()
+    while now_ns < deadline_ns:
+        now_ns = perf_counter_ns()
+    return now_ns
+
+
+def delay_ns(duration_ns: int, sleep_threshold_ns: int = 2_000_000) -> None:
+    """Blocks for the given duration, busy-waiting for short delays and sleeping
+    for most of long ones (see :func:`wait_until_ns`)
+
+    :param int duration_ns: The duration in nanoseconds, where a duration of
+        0 or less returns immediately
+    :param int sleep_threshold_ns: (optional) The delay above which the thread
+        sleeps, default is 2 milliseconds
+    """
+
+    if duration_ns > sleep_threshold_ns:
+        wait_until_ns(time.perf_counter_ns() + duration_ns, sleep_threshold_ns)
+    else:
+        busy_wait_ns(duration_ns)
@@ -0,0 +1,312 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.trace`
+
+Recording of a port's register I/O to a compact binary trace file, and
+replaying of traces against a port
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import struct
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+from parallel64.backends import Backend, WrappingBackend, unwrap_backend
+from parallel64.timing import wait_until_ns
+
+if TYPE_CHECKING:
+    from parallel64 import _BasePort
+
+TRACE_MAGIC = b"P64T"
+"""The bytes at the start of every trace file"""
+
+TRACE_HEADER = struct.Struct("<4sBI")
+"""The layout of the trace header: :const:`TRACE_MAGIC`, the format version and
+the base address that the register offsets are relative to"""
+
+TRACE_ENTRY = struct.Struct("<qhBB")
+"""The layout of a trace entry: a little-endian ``perf_counter_ns()`` timestamp,
+the register address as an offset from the base address, the byte read or
+written and whether it was a write (1) or a read (0)"""
+
+_TRACE_VERSION = 1
+
+
+class _RecordingBackend(WrappingBackend):
+    """Backend wrapping another, passing each access to a recorder"""
+
+    def __init__(self, backend: Backend, recorder: "TraceRecorder") -> None:
+        super().__init__(backend)
+        self._recorder = recorder
+
+    def read_byte(self, address: int) -> int:
+        value = self._wrapped_read_byte(address)
+        self._recorder.record(address, value, False)
+        return value
+
+    def write_byte(self, address: int, value: int) -> None:
+        self._wrapped_write_byte(address, value)
+        self._recorder.record(address, value, True)
+
+    def read_block(self, address: int, count: int) -> bytes:
+        values = self.backend.read_block(address, count)
+        for offset, value in enumerate(values):
+            self._recorder.record(address + offset, value, False)
+        return values
+
+
+class TraceRecorder:
+    """Records every register read and write of a port to a trace file while
+    enabled, by replacing the port's backend with a wrapper.  Anything that
+    bound the backend's functions before recording started, such as a running
+    :class:`parallel64.monitor.EdgeMonitor`, is not recorded.
+
+    .. code-block::
+
+        import parallel64
+        port = parallel64.StandardPort(0x1234)
+        with port.record_trace("session.trace"):
+            port.write_spp_bytes(b"Hello world!")
+
+    :param _BasePort port: The port to record
+    :param str filepath: The path of the trace file to write
+    :param int|None base_address: (optional) The address the register offsets
+        in the trace are relative to, default is the port's SPP base address,
+        or the ECP base address for an :class:`parallel64.ExtendedPort`
+    """
+
+    def __init__(
+        self, port: "_BasePort", filepath: str, base_address: Optional[int] = None
+    ) -> None:
+        if base_address is None:
+            # pylint: disable=protected-access
+            base_address = getattr(port, "_spp_data_address", None)
+            if base_address is None:
+                base_address = port._fifo_address
+        self.port = port
+        self.filepath = filepath
+        self.base_address = base_address
+        self.entries = 0
+        self._file: Optional[BinaryIO] = None
+        self._backend: Optional[_RecordingBackend] = None
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        """Whether the recorder is recording"""
+        return self._backend is not None
+
+    def start(self) -> None:
+        """Creates the trace file and starts recording"""
+
+        if self.recording:
+            return
+        # pylint: disable=consider-using-with
+        self._file = open(self.filepath, mode="wb")
+        self._file.write(
+            TRACE_HEADER.pack(TRACE_MAGIC, _TRACE_VERSION, self.base_address)
+        )
+        self.entries = 0
+        # pylint: disable=protected-access
+        self._backend = _RecordingBackend(self.port._backend, self)
+        self.port._backend = self._backend
+
+    def stop(self) -> None:
+        """Stops recording and closes the trace file"""
+
+        if not self.recording:
+            return
+        # pylint: disable=protected-access
+        self.port._backend = unwrap_backend(self.port._backend, self._backend)
+        self._backend = None
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TraceRecorder":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def record(self, address: int, value: int, write: bool) -> None:
+        """Records a register access.  This is called by the recording backend,
+        but can also be used to record I/O performed another way.
+
+        :param int address: The address of the register
+        :param int value: The byte read or written
+        :param bool write: Whether the access was a write
+        """
+
+        entry = TRACE_ENTRY.pack(
+            time.perf_counter_ns(), address - self.base_address, value, write
+        )
+        with self._lock:
+            if self._file is not None:
+                self._file.write(entry)
+                self.entries += 1
+
+
+class Trace:
+    """A recorded trace of register accesses
+
+    :param int base_address: The address the register offsets are relative to
+    :param bytes data: The entries of the trace, stored back to back using
+        :const:`TRACE_ENTRY`
+    """
+
+    def __init__(self, base_address: int, data: bytes) -> None:
+        self.base_address = base_address
+        self.data = data
+
+    @classmethod
+    def load(cls, filepath: str) -> "Trace":
+        """Reads a trace file
+
+        :param str filepath: The path to the trace file
+        :rtype: Trace
+        :raises ValueError: If the file is not a trace file
+        """
+
+        with open(filepath, mode="rb") as trace_file:
+            header = trace_file.read(TRACE_HEADER.size)
+            data = trace_file.read()
+        if len(header) != TRACE_HEADER.size:
+            raise ValueError("The file is not a trace file")
+        magic, version, base_address = TRACE_HEADER.unpack(header)
+        if magic != TRACE_MAGIC or version != _TRACE_VERSION:
+            raise ValueError("The file is not a trace file")
+        usable = len(data) - len(data) % TRACE_ENTRY.size
+        return cls(base_address, data[:usable])
+
+    def __len__(self) -> int:
+        return len(self.data) // TRACE_ENTRY.size
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int, int]]:
+        """Iterates through the entries as tuples of the timestamp, register
+        offset, value and whether it was a write
+        """
+        return TRACE_ENTRY.iter_unpack(self.data)
+
+    @property
+    def duration_ns(self) -> int:
+        """The time from the first entry to the last in nanoseconds"""
+        if len(self) < 2:
+            return 0
+        first_ns = TRACE_ENTRY.unpack_from(self.data, 0)[0]
+        last_offset = len(self.data) - TRACE_ENTRY.size
+        last_ns = TRACE_ENTRY.unpack_from(self.data, last_offset)[0]
+        return last_ns - first_ns
+
+
+class ReplayReport(NamedTuple):
+    """The results of replaying a trace.  An entry's divergence is how much
+    later (or, if negative, earlier) it was replayed than it was recorded,
+    relative to the first entry.
+
+    :param int entries: The number of entries replayed
+    :param int read_mismatches: The number of reads that returned a different
+        value than was recorded
+    :param int recorded_duration_ns: The duration of the recording
+    :param int replay_duration_ns: The duration of the replay
+    :param int max_divergence_ns: The largest divergence of any entry, by
+        magnitude
+    :param float mean_divergence_ns: The average divergence of the entries
+    """
+
+    entries: int
+    read_mismatches: int
+    recorded_duration_ns: int
+    replay_duration_ns: int
+    max_divergence_ns: int
+    mean_divergence_ns: float
+
+
+# pylint: disable=too-many-locals
+def replay(
+    trace: Trace,
+    port: "_BasePort",
+    base_address: Optional[int] = None,
+    realtime: bool = False,
+) -> ReplayReport:
+    """Replays a trace against a port, writing the recorded writes and
+    performing the recorded reads.  All of the port's register locks are held
+    during the replay.
+
+    :param Trace trace: The trace to replay
+    :param _BasePort port: The port to replay the trace on, which can use a
+        simulated or real backend
+    :param int|None base_address: (optional) The address the register offsets
+        are relative to, default is the base address of the recording
+    :param bool realtime: (optional) Whether to replay each entry at the time it
+        was recorded relative to the first, default is to replay as fast as
+        possible (False)
+    :return: The results of the replay
+    :rtype: ReplayReport
+    """
+
+    if base_address is None:
+        base_address = trace.base_address
+    read_byte = port.backend.read_byte
+    write_byte = port.backend.write_byte
+    perf_counter_ns = time.perf_counter_ns
+
+    entries = tuple(trace)
+    if not entries:
+        return ReplayReport(0, 0, 0, 0, 0, 0.0)
+    recorded_start_ns = entries[0][0]
+
+    mismatches = 0
+    max_divergence_ns = 0
+    total_divergence_ns = 0
+    # pylint: disable=protected-access
+    locks: List[threading.RLock] = [
+        port._register_locks[address] for address in sorted(port._register_locks)
+    ]
+    for lock in locks:
+        lock.acquire()
+    try:
+        start_ns = perf_counter_ns()
+        for timestamp_ns, offset, value, write in entries:
+            recorded_offset_ns = timestamp_ns - recorded_start_ns
+            if realtime:
+                wait_until_ns(start_ns + recorded_offset_ns)
+            divergence_ns = perf_counter_ns() - start_ns - recorded_offset_ns
+            if write:
+                write_byte(base_address + offset, value)
+            elif read_byte(base_address + offset) != value:
+                mismatches += 1
+            if abs(divergence_ns) > abs(max_divergence_ns):
+                max_divergence_ns = divergence_ns
+            total_divergence_ns += divergence_ns
+        replay_duration_ns = perf_counter_ns() - start_ns
+
+        if port.shadow_registers:
+            port.invalidate_shadow_registers()
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+    return ReplayReport(
+        len(entries),
+        mismatches,
+        entries[-1][0] - recorded_start_ns,
+        replay_duration_ns,
+        max_divergence_ns,
+        total_divergence_ns / len(entries),
+    )
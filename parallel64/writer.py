@@ -0,0 +1,195 @@
+# SPDX-FileCopyrightText: 2022 Alec Delaney
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`parallel64.writer`
+
+Background writing of data via SPP from a queue, so that threads
+submitting data do not wait on the device
+
+
+* Author(s): Alec Delaney
+
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Optional
+from parallel64.polling import PollingStrategy
+
+if TYPE_CHECKING:
+    from parallel64 import StandardPort
+
+
+# pylint: disable=too-many-instance-attributes
+class QueuedWriter:
+    """Writes data via SPP from a dedicated thread.  Submissions are queued and
+    written in order using ``write_spp_bytes()``, and each one returns a
+    future for the number of bytes sent.  When the queue is full, further
+    submissions either block until there is room, are dropped (their futures
+    are cancelled) or raise ``queue.Full``, depending on ``backpressure``.
+
+    .. code-block::
+
+        import parallel64
+        port = parallel64.StandardPort(0x1234)
+        with port.queued_writer(max_queue=16) as writer:
+            future = writer.submit(b"Hello world!")
+            writer.flush()
+        print(future.result())
+
+    :param StandardPort port: The port to write to
+    :param int max_queue: (optional) The maximum number of submissions waiting
+        to be written, default is 64
+    :param str backpressure: (optional) What happens to submissions when the
+        queue is full, either ``"block"``, ``"drop"`` or ``"raise"``, default is
+        ``"block"``
+    :param float|None timeout: (optional) The maximum time in seconds to wait
+        for the Busy line to clear each time, default is to wait indefinitely
+        (None).  A submission that times out has its future set to a
+        ``TimeoutError``.  This is ignored if ``polling`` is given.
+    :param PollingStrategy|None polling: (optional) The strategy used to wait
+        on the Busy line, default is to poll continuously
+    :raises ValueError: If ``backpressure`` is not a valid option
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        port: "StandardPort",
+        max_queue: int = 64,
+        backpressure: str = "block",
+        timeout: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> None:
+
+        if backpressure not in ("block", "drop", "raise"):
+            raise ValueError("The backpressure must be 'block', 'drop' or 'raise'")
+        if polling is None and timeout is not None:
+            polling = PollingStrategy(timeout)
+        self.port = port
+        self.backpressure = backpressure
+        self.polling = polling
+
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the writer thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self) -> int:
+        """The number of submissions not yet completely written"""
+        return self._pending
+
+    def start(self) -> None:
+        """Starts the writer thread"""
+
+        if self.running:
+            raise RuntimeError("The writer is already running")
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, buffer) -> Future:
+        """Queues data to be written
+
+        :param buffer: The data to be transmitted, as a ``bytes``, ``bytearray``,
+            ``memoryview`` or other object supporting the buffer protocol, which
+            is copied before this returns
+        :return: A future for the number of bytes sent, which is cancelled if
+            the submission was dropped
+        :rtype: concurrent.futures.Future
+        :raises queue.Full: If the queue is full and ``backpressure`` is
+            ``"raise"``
+        :raises RuntimeError: If the writer has been closed
+        """
+
+        if self._closed:
+            raise RuntimeError("The writer has been closed")
+        future: Future = Future()
+        item = (bytes(buffer), future)
+        with self._idle:
+            self._pending += 1
+        try:
+            if self.backpressure == "block":
+                self._queue.put(item)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self._finish()
+            if self.backpressure == "raise":
+                raise
+            future.cancel()
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits for everything submitted so far to be written
+
+        :param float|None timeout: (optional) The maximum time in seconds to
+            wait, default is to wait indefinitely (None)
+        :return: Whether everything was written before timing out
+        :rtype: bool
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def close(self) -> None:
+        """Stops accepting submissions, writes everything already submitted and
+        stops the writer thread
+        """
+
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "QueuedWriter":
+        if not self.running:
+            self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _finish(self) -> None:
+        """Marks a submission as no longer pending"""
+        with self._idle:
+            self._pending -= 1
+            if not self._pending:
+                self._idle.notify_all()
+
+    def _run(self) -> None:
+        """Writes the queued submissions until closed"""
+
+        write_spp_bytes = self.port.write_spp_bytes
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            data, future = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    sent = write_spp_bytes(data, polling=self.polling)
+                except Exception as err:  # pylint: disable=broad-except
+                    future.set_exception(err)
+                else:
+                    if sent < len(data):
+                        future.set_exception(
+                            TimeoutError(
+                                f"Timed out after sending {sent} of {len(data)} bytes"
+                            )
+                        )
+                    else:
+                        future.set_result(sent)
+            self._finish()